@@ -0,0 +1,131 @@
+import json
+import statistics
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from api.management.wsgi import wsgi_call, wsgi_environ
+from reviews.models import Title
+
+# Режимы замера: название, CONN_MAX_AGE (None - из параметра --max-age),
+# проверка соединения перед запросом.
+MODES = (
+    ('новое соединение', 0, False),
+    ('постоянное', None, False),
+    ('постоянное с проверкой', None, True),
+)
+
+
+class Command(BaseCommand):
+    """Команда manage.py benchmark_connections - замеряет задержку запроса
+    к API с новым соединением с БД на каждый запрос и с постоянными
+    соединениями (с проверкой и без). Запросы проходят полный цикл
+    обработчика WSGI, включая сигналы начала и конца запроса, которые
+    закрывают устаревшие соединения.
+    python manage.py benchmark_connections --requests 500 - число
+    запросов в каждом режиме.
+    python manage.py benchmark_connections --path /api/v1/genres/ -
+    адрес запроса (по умолчанию - отзывы первого произведения, ответ
+    не кешируется).
+    Чтобы оценить PgBouncer, запустите команду повторно с DB_HOST и
+    DB_POOL, указывающими на пулер, и сравните результаты.
+    """
+    help = (
+        'используйте: manage.py benchmark_connections'
+        ' для замера задержки запроса с постоянными соединениями и без'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-n', '--requests',
+            type=int, default=200,
+            help='количество запросов в каждом режиме'
+        )
+        parser.add_argument(
+            '--path',
+            type=str, help='адрес запроса к API'
+        )
+        parser.add_argument(
+            '--max-age',
+            type=int, default=60,
+            help='CONN_MAX_AGE для режимов с постоянным соединением'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            type=str, help='файл для результатов в формате JSON'
+        )
+
+    def handle(self, *args, **options):
+        path = options.get('path') or self.default_path()
+        handler = WSGIHandler()
+        saved = {
+            key: connection.settings_dict.get(key)
+            for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')
+        }
+        results = []
+        try:
+            for name, max_age, health_checks in MODES:
+                connection.settings_dict['CONN_MAX_AGE'] = (
+                    options['max_age'] if max_age is None else max_age
+                )
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = (
+                    health_checks
+                )
+                connection.close()
+                results.append(dict(
+                    mode=name,
+                    **self.measure(handler, path, options['requests'])
+                ))
+        finally:
+            connection.settings_dict.update(saved)
+            connection.close()
+        for result in results:
+            self.stdout.write(
+                f'{result["mode"]:<24}'
+                f' соединений: {result["connections"]:<6}'
+                f' медиана: {result["median_ms"]:8.2f} мс'
+                f' p95: {result["p95_ms"]:8.2f} мс'
+            )
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(
+                    {'vendor': connection.vendor,
+                     'host': connection.settings_dict.get('HOST'),
+                     'path': path,
+                     'results': results},
+                    output, ensure_ascii=False, indent=2
+                )
+
+    def default_path(self):
+        title_id = Title.objects.values_list('pk', flat=True).first()
+        if title_id is None:
+            raise CommandError(
+                'В БД нет произведений, укажите адрес запроса в --path.'
+            )
+        return f'/api/v1/titles/{title_id}/reviews/'
+
+    def measure(self, handler, path, requests):
+        opened = []
+
+        def count(sender, **kwargs):
+            opened.append(sender)
+
+        connection_created.connect(count)
+        timings, statuses = [], set()
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                statuses.add(wsgi_call(handler, wsgi_environ(path)))
+                timings.append(time.perf_counter() - started)
+        finally:
+            connection_created.disconnect(count)
+        timings.sort()
+        return {
+            'connections': len(opened),
+            'statuses': sorted(statuses),
+            'median_ms': statistics.median(timings) * 1000,
+            'p95_ms': timings[int(len(timings) * 0.95)] * 1000,
+        }
@@ -0,0 +1,159 @@
+import io
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.parsers import FastJSONParser
+from api.v1.renderers import FastJSONRenderer, orjson
+
+
+def title_page(size):
+    """Страница произведений в том виде, в каком её отдаёт API: вложенные
+    жанры и категория, кириллица, рейтинг может отсутствовать.
+    """
+    genres = [
+        {'name': f'Жанр {number}', 'slug': f'genre-{number}'}
+        for number in range(10)
+    ]
+    return {
+        'count': size * 50,
+        'next': f'http://localhost/api/v1/titles/?limit={size}&offset={size}',
+        'previous': None,
+        'results': [
+            {
+                'id': number,
+                'name': f'Произведение «Название» № {number}',
+                'year': 1900 + number % 120,
+                'rating': number % 10 + 1 if number % 7 else None,
+                'description': 'Описание произведения на русском языке. ' * 5,
+                'genre': genres[number % 8:number % 8 + 3],
+                'category': {'name': 'Книги', 'slug': 'books'},
+            }
+            for number in range(size)
+        ],
+    }
+
+
+def review_page(size):
+    """Страница отзывов с датами и Decimal, которые кодирует JSONEncoder
+    DRF, а не сам orjson.
+    """
+    started = timezone.make_aware(datetime(2023, 1, 1, 12, 30, 15, 123456))
+    return {
+        'count': size,
+        'results': [
+            {
+                'id': number,
+                'author': f'user{number}',
+                'text': 'Текст отзыва\u2028с разделителем строк. ' * 3,
+                'score': number % 10 + 1,
+                'mean': Decimal('7.25'),
+                'pub_date': started + timedelta(minutes=number),
+            }
+            for number in range(size)
+        ],
+    }
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+class Command(BaseCommand):
+    """Команда manage.py benchmark_json - сравнивает рендеринг и разбор
+    JSON модулем json (JSONRenderer, JSONParser DRF) и orjson
+    (FastJSONRenderer, FastJSONParser) на страницах произведений и
+    отзывов и проверяет, что ответы совпадают байт в байт.
+    python manage.py benchmark_json --size 100 - размер страницы.
+    python manage.py benchmark_json --repeat 500 - количество повторов.
+    """
+    help = (
+        'используйте: manage.py benchmark_json'
+        ' для сравнения рендеринга JSON на json и orjson'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-s', '--size',
+            type=int, default=100,
+            help='количество записей на странице'
+        )
+        parser.add_argument(
+            '-r', '--repeat',
+            type=int, default=200,
+            help='количество повторов каждого замера'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            type=str, help='файл для результатов в формате JSON'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write(
+                'orjson не установлен: FastJSONRenderer использует json.'
+            )
+        results = []
+        for name, data in (
+            ('titles', title_page(options['size'])),
+            ('reviews', review_page(options['size'])),
+        ):
+            results.append(self.compare(name, data, options['repeat']))
+        for result in results:
+            self.stdout.write(
+                f'{result["page"]:<8} {result["bytes"]:>8} байт'
+                f'  рендеринг: {result["render_json_ms"]:7.3f} ->'
+                f' {result["render_fast_ms"]:7.3f} мс'
+                f'  разбор: {result["parse_json_ms"]:7.3f} ->'
+                f' {result["parse_fast_ms"]:7.3f} мс'
+            )
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(
+                    {'orjson': orjson.__version__ if orjson else None,
+                     'results': results},
+                    output, ensure_ascii=False, indent=2
+                )
+
+    def compare(self, name, data, repeat):
+        standard, fast = JSONRenderer(), FastJSONRenderer()
+        content = standard.render(data)
+        if fast.render(data) != content:
+            raise CommandError(
+                f'Ответы JSONRenderer и FastJSONRenderer для {name}'
+                ' различаются.'
+            )
+        standard_parser, fast_parser = JSONParser(), FastJSONParser()
+        if fast_parser.parse(io.BytesIO(content)) != standard_parser.parse(
+            io.BytesIO(content)
+        ):
+            raise CommandError(
+                f'Результаты JSONParser и FastJSONParser для {name}'
+                ' различаются.'
+            )
+        return {
+            'page': name,
+            'bytes': len(content),
+            'render_json_ms': measure(
+                lambda: standard.render(data), repeat
+            ),
+            'render_fast_ms': measure(lambda: fast.render(data), repeat),
+            'parse_json_ms': measure(
+                lambda: standard_parser.parse(io.BytesIO(content)), repeat
+            ),
+            'parse_fast_ms': measure(
+                lambda: fast_parser.parse(io.BytesIO(content)), repeat
+            ),
+        }
@@ -0,0 +1,155 @@
+import json
+import statistics
+import time
+import uuid
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.management.wsgi import wsgi_call, wsgi_environ
+from api.v1.authentication import RoleAccessToken
+from reviews.models import Title
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Команда manage.py benchmark_review_writes - замеряет создание
+    отзывов через API: отзывы разных пользователей на одно произведение,
+    затем повторные отзывы тех же пользователей, которые API отклоняет.
+    Печатает число отзывов в секунду, задержку и число запросов к БД на
+    один запрос к API. Созданные пользователи, произведение и отзывы
+    удаляются по завершении.
+    python manage.py benchmark_review_writes --reviews 1000 - количество
+    отзывов.
+    python manage.py benchmark_review_writes --batch 100 - отзывы
+    создаются пакетами по 100 через /api/v1/batch/reviews/ от имени
+    администратора.
+    python manage.py benchmark_review_writes --output writes.json -
+    сохраняет результаты в файл.
+    """
+    help = (
+        'используйте: manage.py benchmark_review_writes'
+        ' для замера создания отзывов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-n', '--reviews',
+            type=int, default=200,
+            help='количество создаваемых отзывов'
+        )
+        parser.add_argument(
+            '-d', '--duplicates',
+            type=int, default=50,
+            help='количество повторных отзывов'
+        )
+        parser.add_argument(
+            '-b', '--batch',
+            type=int, default=0,
+            help='размер пакета; 0 - по одному отзыву в запросе'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            type=str, help='файл для результатов в формате JSON'
+        )
+
+    def handle(self, *args, **options):
+        prefix = f'bench-{uuid.uuid4().hex[:8]}'
+        title = Title.objects.create(name=prefix, year=2000)
+        User.objects.bulk_create(
+            User(username=f'{prefix}-{number}',
+                 email=f'{prefix}-{number}@yamdb.fake')
+            for number in range(options['reviews'])
+        )
+        users = list(User.objects.filter(username__startswith=prefix))
+        handler = WSGIHandler()
+        try:
+            single = [
+                (f'/api/v1/titles/{title.pk}/reviews/',
+                 str(RoleAccessToken.for_user(user)),
+                 self.review(number))
+                for number, user in enumerate(users)
+            ]
+            if options['batch']:
+                creates = self.batches(
+                    prefix, title, users, options['batch']
+                )
+            else:
+                creates = single
+            results = [dict(
+                kind='создание', reviews=len(users),
+                **self.measure(handler, creates, len(users))
+            )]
+            if options['duplicates']:
+                duplicates = single[:options['duplicates']]
+                results.append(dict(
+                    kind='повтор', reviews=len(duplicates),
+                    **self.measure(handler, duplicates, len(duplicates))
+                ))
+        finally:
+            title.delete()
+            User.objects.filter(username__startswith=prefix).delete()
+        for result in results:
+            self.stdout.write(
+                f'{result["kind"]:<10}'
+                f' запросов: {result["requests"]:<6}'
+                f' отзывов в секунду: {result["per_second"]:8.1f}'
+                f' медиана: {result["median_ms"]:7.2f} мс'
+                f' p95: {result["p95_ms"]:7.2f} мс'
+                f' запросов к БД: {result["queries"]:.1f}'
+                f' статусы: {", ".join(result["statuses"])}'
+            )
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(
+                    {'vendor': connection.vendor, 'results': results},
+                    output, ensure_ascii=False, indent=2
+                )
+
+    def review(self, number):
+        return {'text': f'Отзыв {number}', 'score': number % 10 + 1}
+
+    def batches(self, prefix, title, users, size):
+        admin = User.objects.create(
+            username=f'{prefix}-admin', email=f'{prefix}-admin@yamdb.fake',
+            role=User.ChoicesRole.ADMIN_ROLE
+        )
+        token = str(RoleAccessToken.for_user(admin))
+        items = [
+            dict(self.review(number), title=title.pk, author=user.username)
+            for number, user in enumerate(users)
+        ]
+        return [
+            ('/api/v1/batch/reviews/', token, items[start:start + size])
+            for start in range(0, len(items), size)
+        ]
+
+    def measure(self, handler, requests, reviews):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        timings, statuses = [], set()
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            for path, token, data in requests:
+                body = json.dumps(data).encode('utf-8')
+                request_started = time.perf_counter()
+                statuses.add(wsgi_call(handler, wsgi_environ(
+                    path, 'POST', body, 'application/json',
+                    {'Authorization': f'Bearer {token}'}
+                )))
+                timings.append(time.perf_counter() - request_started)
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        return {
+            'requests': len(requests),
+            'statuses': sorted(statuses),
+            'per_second': reviews / elapsed if elapsed else 0,
+            'median_ms': statistics.median(timings) * 1000,
+            'p95_ms': timings[int(len(timings) * 0.95)] * 1000,
+            'queries': len(queries) / len(requests),
+        }
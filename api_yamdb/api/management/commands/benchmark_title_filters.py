@@ -0,0 +1,173 @@
+import json
+import re
+import statistics
+import time
+from itertools import combinations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.v1.filters import TitleFilter
+from reviews.models import Category, Genre, GenreTitle, Title
+
+FILTER_FIELDS = ('category', 'genre', 'name', 'year')
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    """Команда manage.py benchmark_title_filters - заполняет БД
+    синтетическим каталогом, замеряет время всех сочетаний фильтров
+    списка произведений и сохраняет план каждого запроса (EXPLAIN).
+    Все созданные данные откатываются по завершении.
+    python manage.py benchmark_title_filters --titles 100000 - размер
+    каталога.
+    python manage.py benchmark_title_filters --output plans.json -
+    сохраняет результаты в файл, чтобы сравнивать планы между версиями.
+    python manage.py benchmark_title_filters --fail-on-scan - завершается
+    с ошибкой, если запрос с фильтром читает таблицу произведений целиком.
+    """
+    help = (
+        'используйте: manage.py benchmark_title_filters'
+        ' для замера фильтров списка произведений'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-n', '--titles',
+            type=int, default=50000,
+            help='количество произведений в синтетическом каталоге'
+        )
+        parser.add_argument(
+            '-r', '--repeat',
+            type=int, default=20,
+            help='количество повторов каждого запроса'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            type=str, help='файл для результатов в формате JSON'
+        )
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='ошибка, если фильтр читает таблицу целиком'
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        with transaction.atomic():
+            sample = self.seed(options['titles'])
+            for fields in self.filter_combinations():
+                results.append(
+                    self.measure(fields, sample, options['repeat'])
+                )
+            transaction.set_rollback(True)
+        for result in results:
+            self.stdout.write(
+                f'{result["filters"] or "-":<26}'
+                f' строк: {result["rows"]:<6}'
+                f' медиана: {result["median_ms"]:8.2f} мс'
+                f' p95: {result["p95_ms"]:8.2f} мс'
+                f'{"  ПОЛНОЕ ЧТЕНИЕ" if result["full_scan"] else ""}'
+            )
+        if options.get('output'):
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(
+                    {'vendor': connection.vendor,
+                     'titles': options['titles'],
+                     'results': results},
+                    output, ensure_ascii=False, indent=2
+                )
+        scans = [result['filters'] for result in results
+                 if result['full_scan'] and result['filters']]
+        if options.get('fail_on_scan') and scans:
+            raise CommandError(
+                f'Полное чтение таблицы произведений: {", ".join(scans)}.'
+            )
+
+    @staticmethod
+    def filter_combinations():
+        for size in range(len(FILTER_FIELDS) + 1):
+            yield from combinations(FILTER_FIELDS, size)
+
+    def seed(self, count):
+        """Создаёт каталог из count произведений с двумя жанрами у
+        каждого и возвращает значения фильтров одного из них.
+        """
+        # bulk_create не возвращает id на SQLite, объекты перечитываются.
+        Category.objects.bulk_create(
+            Category(name=f'Бенчмарк {i}', slug=f'benchmark-{i}')
+            for i in range(20)
+        )
+        categories = list(
+            Category.objects.filter(slug__startswith='benchmark-')
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'Бенчмарк {i}', slug=f'benchmark-{i}')
+            for i in range(40)
+        )
+        genres = list(Genre.objects.filter(slug__startswith='benchmark-'))
+        first_pk = (
+            Title.objects.order_by('-pk').values_list('pk', flat=True).first()
+            or 0
+        ) + 1
+        Title.objects.bulk_create(
+            (
+                Title(
+                    pk=first_pk + i,
+                    name=f'Бенчмарк {i}',
+                    year=1900 + i % 120,
+                    category=categories[i % len(categories)],
+                )
+                for i in range(count)
+            ),
+            batch_size=2000
+        )
+        GenreTitle.objects.bulk_create(
+            (
+                GenreTitle(
+                    title_id=first_pk + i,
+                    genre=genres[(i + shift) % len(genres)]
+                )
+                for i in range(count)
+                for shift in (0, 7)
+            ),
+            batch_size=2000
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        title = Title.objects.get(pk=first_pk + count // 2)
+        return {
+            'category': title.category.slug,
+            'genre': title.genre.first().slug,
+            'name': title.name,
+            'year': title.year,
+        }
+
+    def measure(self, fields, sample, repeat):
+        data = {field: sample[field] for field in fields}
+        queryset = TitleFilter(data, queryset=Title.objects.all()).qs
+        page = queryset[:PAGE_SIZE]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset.count()
+            rows = len(list(page))
+            timings.append((time.perf_counter() - started) * 1000)
+        plan = page.explain()
+        timings.sort()
+        return {
+            'filters': '+'.join(fields),
+            'rows': rows,
+            'median_ms': statistics.median(timings),
+            'p95_ms': timings[int(len(timings) * 0.95) - 1],
+            'full_scan': self.is_full_scan(plan),
+            'plan': plan,
+        }
+
+    @staticmethod
+    def is_full_scan(plan):
+        table = Title._meta.db_table
+        return bool(
+            re.search(rf'Seq Scan on {table}\b', plan)
+            or re.search(rf'\bSCAN {table}\b', plan)
+        )
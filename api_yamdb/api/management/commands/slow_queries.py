@@ -0,0 +1,113 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = ('total', 'count', 'max')
+
+
+class Command(BaseCommand):
+    """Команда manage.py slow_queries - сводка журнала медленных запросов
+    к БД по отпечаткам: число повторов, суммарное, среднее и наибольшее
+    время, SQL, место вызова и план выполнения.
+    python manage.py slow_queries --top 5 --sort max - пять запросов с
+    наибольшим временем выполнения.
+    python manage.py slow_queries --hours 24 - только записи за сутки.
+    python manage.py slow_queries --plans - вывести планы выполнения.
+    """
+    help = (
+        'используйте: manage.py slow_queries'
+        ' для сводки журнала медленных запросов к БД'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log',
+            type=str, help='файл журнала, по умолчанию SLOW_QUERY_LOG'
+        )
+        parser.add_argument(
+            '-n', '--top',
+            type=int, default=10,
+            help='количество запросов в сводке'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=SORT_KEYS, default='total',
+            help='порядок: суммарное время, число повторов, наибольшее время'
+        )
+        parser.add_argument(
+            '--hours',
+            type=float, help='учитывать записи за последние часы'
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='вывести планы выполнения'
+        )
+
+    def handle(self, *args, **options):
+        path = options.get('log') or settings.SLOW_QUERY_LOG
+        since = (
+            time.time() - options['hours'] * 3600
+            if options.get('hours') else None
+        )
+        try:
+            queries = self.aggregate(path, since)
+        except FileNotFoundError:
+            raise CommandError(f'Журнал {path} не найден.')
+        if not queries:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        offenders = sorted(
+            queries.values(), key=lambda query: query[options['sort']],
+            reverse=True
+        )[:options['top']]
+        for number, query in enumerate(offenders, 1):
+            self.write_query(number, query, options['plans'])
+
+    def aggregate(self, path, since):
+        queries = {}
+        with open(path, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if since and record['time'] < since:
+                    continue
+                query = queries.setdefault(record['fingerprint'], {
+                    'fingerprint': record['fingerprint'],
+                    'count': 0, 'total': 0.0, 'max': 0.0,
+                    'endpoints': set(), 'sql': None,
+                })
+                query['count'] += 1
+                query['total'] += record['duration_ms']
+                query['max'] = max(query['max'], record['duration_ms'])
+                if record.get('endpoint'):
+                    query['endpoints'].add(record['endpoint'])
+                if 'sql' in record:
+                    query.update(
+                        (key, record.get(key))
+                        for key in ('sql', 'params', 'stack', 'plan')
+                    )
+        return queries
+
+    def write_query(self, number, query, plans):
+        self.stdout.write(
+            f'{number}. {query["fingerprint"]}'
+            f' повторов: {query["count"]}'
+            f' всего: {query["total"]:.1f} мс'
+            f' среднее: {query["total"] / query["count"]:.1f} мс'
+            f' максимум: {query["max"]:.1f} мс'
+        )
+        self.stdout.write(f'   SQL: {query["sql"] or "нет в журнале"}')
+        if query.get('params'):
+            self.stdout.write(f'   Параметры: {query["params"]}')
+        for endpoint in sorted(query['endpoints'])[:5]:
+            self.stdout.write(f'   Запрос: {endpoint}')
+        for frame in query.get('stack') or ():
+            self.stdout.write(f'   {frame}')
+        if plans and query.get('plan'):
+            for line in query['plan'].splitlines():
+                self.stdout.write(f'   | {line}')
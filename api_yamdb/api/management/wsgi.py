@@ -0,0 +1,45 @@
+import io
+import sys
+
+
+def wsgi_environ(path, method='GET', body=b'', content_type=None,
+                 headers=None):
+    """Окружение WSGI запроса для замеров через WSGIHandler: запрос
+    проходит все middleware и сигналы начала и конца запроса.
+    """
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if content_type:
+        environ['CONTENT_TYPE'] = content_type
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def wsgi_call(handler, environ):
+    """Выполняет запрос и возвращает статус ответа. Закрытие ответа
+    отправляет сигнал конца запроса, как это делает сервер.
+    """
+    statuses = []
+    response = handler(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    b''.join(response)
+    response.close()
+    return statuses[0]
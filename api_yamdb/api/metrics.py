@@ -0,0 +1,137 @@
+"""Метрики в формате Prometheus.
+
+Под gunicorn метрики каждого воркера пишутся в файлы каталога
+PROMETHEUS_MULTIPROC_DIR (его задаёт gunicorn.conf.py), а эндпоинт
+/metrics складывает значения всех процессов. Без этой переменной
+(runserver, тесты) используется реестр текущего процесса.
+"""
+import os
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+    Histogram, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+REQUESTS = Counter(
+    'api_requests', 'Запросы к API',
+    ['resource', 'action', 'status']
+)
+LATENCY = Histogram(
+    'api_request_duration_seconds', 'Время обработки запроса',
+    ['resource', 'action'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+DB_QUERIES = Histogram(
+    'api_request_db_queries', 'Число запросов к БД на запрос к API',
+    ['resource', 'action'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+DB_TIME = Counter(
+    'api_db_duration_seconds', 'Время запросов к БД',
+    ['resource', 'action']
+)
+RESPONSE_CACHE = Counter(
+    'api_response_cache', 'Обращения к кешу ответов каталога', ['result']
+)
+CACHE_HITS = RESPONSE_CACHE.labels('hit')
+CACHE_MISSES = RESPONSE_CACHE.labels('miss')
+
+WORKERS = Gauge(
+    'gunicorn_workers', 'Работающие воркеры gunicorn',
+    multiprocess_mode='livesum'
+)
+WORKER_STARTS = Counter('gunicorn_worker_starts', 'Запуски воркеров')
+WORKER_EXITS = Counter(
+    'gunicorn_worker_exits', 'Остановки воркеров', ['reason']
+)
+
+
+def multiprocess_mode():
+    return 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+
+def view_labels(request):
+    """Ресурс и действие запроса: basename роутера и действие viewset
+    (list, retrieve, create...), для функций-представлений - имя
+    маршрута и метод.
+    """
+    method = request.method.lower()
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved', method
+    initkwargs = getattr(match.func, 'initkwargs', None)
+    if initkwargs is None:
+        return 'other', method
+    actions = getattr(match.func, 'actions', None) or {}
+    return (
+        initkwargs.get('basename') or match.url_name or 'other',
+        actions.get(method, method),
+    )
+
+
+def observe_request(request, response, timings):
+    resource, action = view_labels(request)
+    REQUESTS.labels(
+        resource, action, f'{response.status_code // 100}xx'
+    ).inc()
+    LATENCY.labels(resource, action).observe(timings.total)
+    DB_QUERIES.labels(resource, action).observe(timings.db_queries)
+    DB_TIME.labels(resource, action).inc(timings.db_time)
+
+
+class OutboxCollector:
+    """Размер очереди писем, считается из БД при каждом сборе метрик."""
+
+    def describe(self):
+        return self.families()
+
+    def collect(self):
+        from users.outbox import outbox_depth
+
+        depth = outbox_depth()
+        return self.families(
+            depth['pending'], depth['failed'], depth['oldest_age']
+        )
+
+    def families(self, pending=None, failed=None, oldest_age=None):
+        families = []
+        for name, documentation, value in (
+            ('email_outbox_pending', 'Письма в очереди', pending),
+            ('email_outbox_failed', 'Письма, исчерпавшие попытки', failed),
+            ('email_outbox_oldest_age_seconds',
+             'Возраст самого старого письма в очереди', oldest_age),
+        ):
+            family = GaugeMetricFamily(name, documentation)
+            if value is not None:
+                family.add_metric([], value)
+            families.append(family)
+        return families
+
+
+if not multiprocess_mode():
+    REGISTRY.register(OutboxCollector())
+
+
+def metrics_registry():
+    if not multiprocess_mode():
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    registry.register(OutboxCollector())
+    return registry
+
+
+def render_metrics():
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def metrics_view(request):
+    """Эндпоинт /metrics для сбора метрик Prometheus."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
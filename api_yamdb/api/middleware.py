@@ -0,0 +1,105 @@
+import asyncio
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+
+from api.metrics import observe_request
+from api.timings import (
+    RequestTimings, current_timings, measure_request, observe
+)
+
+logger = logging.getLogger('api.timings')
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return f'{request.method} {match.view_name if match else "unresolved"}'
+
+
+class TimingMiddleware:
+    """Замеряет обработку запроса: общее время, число и время запросов к
+    БД, время рендеринга ответа и обращения к кешу ответов.
+
+    Если включены метрики (METRICS_ENABLED) или журнал медленных запросов
+    к БД (SLOW_QUERY_THRESHOLD_MS), замеряется каждый запрос. Для доли
+    TIMING_SAMPLE_RATE запросов ответ получает заголовок Server-Timing
+    (если SERVER_TIMING_HEADER), замер попадает в скользящее окно
+    эндпоинта, а доля TIMING_LOG_SAMPLE_RATE из них пишется в журнал
+    api.timings строкой JSON.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # В режиме ASGI обработчик асинхронный: без этого Django выполнял
+        # бы middleware и всё после него в одном общем потоке процесса.
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled, timings = self.start(request)
+        if timings is None:
+            return self.get_response(request)
+        with measure_request(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings, sampled)
+
+    async def __acall__(self, request):
+        sampled, timings = self.start(request)
+        if timings is None:
+            return await self.get_response(request)
+        with measure_request(timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, timings, sampled)
+
+    def start(self, request):
+        """Решает, замерять ли запрос: (попал ли в выборку, замер или
+        None).
+        """
+        sampled = random.random() < settings.TIMING_SAMPLE_RATE
+        if not (
+            sampled or settings.METRICS_ENABLED
+            or settings.SLOW_QUERY_THRESHOLD_MS
+        ):
+            return sampled, None
+        return sampled, RequestTimings(f'{request.method} {request.path}')
+
+    def finish(self, request, response, timings, sampled):
+        if settings.METRICS_ENABLED:
+            observe_request(request, response, timings)
+        if sampled:
+            self.report(request, response, timings)
+        return response
+
+    def report(self, request, response, timings):
+        endpoint = endpoint_name(request)
+        observe(endpoint, timings)
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = timings.server_timing()
+        if random.random() < settings.TIMING_LOG_SAMPLE_RATE:
+            logger.info(json.dumps({
+                'endpoint': endpoint,
+                'path': request.path,
+                'status': response.status_code,
+                **timings.as_dict(),
+            }))
+
+    def process_template_response(self, request, response):
+        # Вызывается непосредственно перед рендерингом ответа DRF.
+        timings = current_timings()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                timings.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
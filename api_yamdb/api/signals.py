@@ -0,0 +1,59 @@
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.v1.authentication import forget_token_version
+from api.v1.cache import bump_generation_on_commit
+from api_yamdb.db import check_connections_on_first_use
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title
+)
+from reviews.signals import bulk_loaded
+from users.models import User
+
+VERSIONED_MODELS = (Category, Comment, Genre, GenreTitle, Title, User)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def versioned_model_changed(sender, **kwargs):
+    """Меняет поколение изменённой модели: закешированные ответы и
+    ETag, построенные по её данным, становятся недействительными.
+    """
+    if sender in VERSIONED_MODELS:
+        bump_generation_on_commit(sender)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_generation_on_commit(GenreTitle)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, **kwargs):
+    """Отзыв меняет рейтинг произведения, который отдаётся в каталоге."""
+    bump_generation_on_commit(Review, Title)
+
+
+@receiver(bulk_loaded)
+def model_bulk_loaded(sender, **kwargs):
+    if sender is Review:
+        bump_generation_on_commit(Review, Title)
+    elif sender in VERSIONED_MODELS:
+        bump_generation_on_commit(sender)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Сбрасывает закешированную версию токенов пользователя."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_token_version(user_id))
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    check_connections_on_first_use()
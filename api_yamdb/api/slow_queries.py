@@ -0,0 +1,144 @@
+"""Журнал медленных запросов к БД.
+
+Запрос к БД, выполненный при обработке запроса к API дольше
+SLOW_QUERY_THRESHOLD_MS, дописывается строкой JSON в файл SLOW_QUERY_LOG.
+Первая запись отпечатка запроса в процессе содержит SQL, параметры, место
+вызова в коде проекта и план выполнения (EXPLAIN); повторные - только
+отпечаток, длительность и адрес запроса. Сводку по отпечаткам печатает
+команда manage.py slow_queries.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+
+STACK_DEPTH = 8
+PARAM_LENGTH = 200
+
+_described_lock = threading.Lock()
+_described = set()
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACES = re.compile(r'\s+')
+_SKIP_FILES = (
+    os.path.join('api', 'middleware.py'),
+    os.path.join('api', 'slow_queries.py'),
+    os.path.join('api', 'timings.py'),
+)
+
+
+def slow_query_threshold():
+    """Порог в секундах; None - журнал выключен."""
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    return threshold / 1000 if threshold else None
+
+
+def normalize(sql):
+    """SQL без значений: списки IN любой длины, числа и строки,
+    подставленные в запрос (например, LIMIT), заменяются заглушками.
+    """
+    sql = _IN_LIST.sub('(%s, ...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('N', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode('utf-8')).hexdigest()[:16]
+
+
+def call_site():
+    """Кадры стека из кода проекта, от внешнего к месту запроса."""
+    base_dir = str(settings.BASE_DIR) + os.sep
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and not frame.filename.endswith(_SKIP_FILES)
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, base_dir)}:{frame.lineno}'
+        f' in {frame.name}'
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+def explain(connection, sql, params):
+    """План запроса. Выполняется без обёрток execute_wrapper, чтобы сам
+    EXPLAIN не замерялся и не журналировался, и в точке сохранения: ошибка
+    EXPLAIN не прерывает транзакцию запроса. Журнал - диагностика, поэтому
+    любая ошибка возвращается текстом, а не пробрасывается в запрос.
+    """
+    wrappers = connection.execute_wrappers
+    connection.execute_wrappers = []
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'{connection.ops.explain_query_prefix()} {sql}', params
+                )
+                rows = cursor.fetchall()
+    except Exception as error:
+        return f'EXPLAIN не выполнен: {error}'
+    finally:
+        connection.execute_wrappers = wrappers
+    # Описание шага плана - последний столбец (у postgres - единственный).
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def printable(params):
+    if params is None:
+        return None
+    return [
+        value if isinstance(value, (int, float, bool, type(None)))
+        else str(value)[:PARAM_LENGTH]
+        for value in params
+    ]
+
+
+def write(record):
+    # Одна запись - один вызов write в файл, открытый на дозапись:
+    # строки разных воркеров не перемешиваются.
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+    descriptor = os.open(
+        settings.SLOW_QUERY_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+        0o644
+    )
+    try:
+        os.write(descriptor, line.encode('utf-8'))
+    finally:
+        os.close(descriptor)
+
+
+def log_slow_query(connection, sql, params, many, duration, endpoint):
+    key = fingerprint(sql)
+    record = {
+        'time': time.time(),
+        'fingerprint': key,
+        'duration_ms': round(duration * 1000, 2),
+        'endpoint': endpoint,
+    }
+    with _described_lock:
+        first = key not in _described
+        _described.add(key)
+    if first:
+        select = not many and sql.lstrip()[:6].upper() == 'SELECT'
+        record.update(
+            vendor=connection.vendor,
+            sql=sql,
+            params=None if many else printable(params),
+            stack=call_site(),
+            plan=explain(connection, sql, params) if select else None,
+        )
+    try:
+        write(record)
+    except OSError:
+        # Журнал не должен ломать обработку запроса.
+        pass
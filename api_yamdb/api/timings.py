@@ -0,0 +1,176 @@
+import contextvars
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from api.slow_queries import log_slow_query, slow_query_threshold
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+_windows_lock = threading.Lock()
+_windows = defaultdict(lambda: deque(maxlen=settings.TIMING_WINDOW))
+
+
+class RequestTimings:
+    """Замеры одного запроса: время обработки, запросы к БД, рендеринг
+    ответа и обращения к кешу ответов.
+    """
+
+    def __init__(self, endpoint=None):
+        self.endpoint = endpoint
+        self.slow_query_threshold = slow_query_threshold()
+        self.started = time.perf_counter()
+        self.total = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка выполнения запросов к БД (connection.execute_wrapper)."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.db_queries += 1
+            if self.slow_query_threshold is not None and (
+                duration >= self.slow_query_threshold
+            ):
+                log_slow_query(
+                    context['connection'], sql, params, many, duration,
+                    self.endpoint
+                )
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    @property
+    def app_time(self):
+        return max(0.0, self.total - self.db_time - self.render_time)
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing, длительности в миллисекундах."""
+        return ', '.join((
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.db_queries} queries"',
+            f'serialize;dur={self.render_time * 1000:.1f}',
+            f'app;dur={self.app_time * 1000:.1f}',
+            f'cache;desc="hits {self.cache_hits} '
+            f'misses {self.cache_misses}"',
+        ))
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'db_queries': self.db_queries,
+            'serialize_ms': round(self.render_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def current_timings():
+    """Замеры текущего запроса или None, если запрос не попал в выборку."""
+    return _current.get()
+
+
+@contextmanager
+def measure_request(timings):
+    token = _current.set(timings)
+    try:
+        with measure_queries(timings):
+            yield timings
+    finally:
+        _current.reset(token)
+        timings.finish()
+
+
+@contextmanager
+def measure_queries(timings):
+    """Учитывает запросы ко всем БД текущего потока. Обёртки соединений
+    действуют только в потоке, где установлены, поэтому код, который
+    выполняет представление в другом потоке, оборачивает его отдельно.
+    """
+    with ExitStack() as stack:
+        if timings is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+        yield
+
+
+def render_response(response):
+    """Рендерит ответ, учитывая время рендеринга в замерах запроса."""
+    timings = current_timings()
+    started = time.perf_counter()
+    try:
+        return response.render()
+    finally:
+        if timings is not None:
+            timings.render_time += time.perf_counter() - started
+
+
+def record_cache(hit):
+    timings = current_timings()
+    if timings is None:
+        return
+    if hit:
+        timings.cache_hits += 1
+    else:
+        timings.cache_misses += 1
+
+
+def observe(endpoint, timings):
+    with _windows_lock:
+        _windows[endpoint].append(
+            (timings.total, timings.db_time, timings.db_queries)
+        )
+
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def endpoint_timings():
+    """Перцентили времени обработки по эндпоинтам за последние
+    TIMING_WINDOW запросов каждого эндпоинта в текущем процессе.
+    """
+    with _windows_lock:
+        windows = {
+            endpoint: list(window) for endpoint, window in _windows.items()
+        }
+    endpoints = {}
+    for endpoint, samples in sorted(windows.items()):
+        totals = sorted(total for total, _, _ in samples)
+        endpoints[endpoint] = {
+            'count': len(samples),
+            'p50_ms': round(percentile(totals, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(totals, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(totals, 0.99) * 1000, 2),
+            'db_ms_mean': round(
+                sum(db_time for _, db_time, _ in samples)
+                / len(samples) * 1000, 2
+            ),
+            'db_queries_mean': round(
+                sum(queries for _, _, queries in samples) / len(samples), 2
+            ),
+        }
+    return {
+        'pid': os.getpid(),
+        'window': settings.TIMING_WINDOW,
+        'endpoints': endpoints,
+    }
+
+
+def reset_timings():
+    with _windows_lock:
+        _windows.clear()
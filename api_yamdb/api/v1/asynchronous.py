@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern
+
+from api.timings import current_timings, measure_queries, render_response
+from api_yamdb.db import check_connections_on_first_use
+
+# Потоки, в которых выполняются представления в режиме ASGI. Каждый
+# поток держит своё соединение с БД, поэтому пул ограничен.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ASGI_VIEW_THREADS,
+    thread_name_prefix='api-view'
+)
+
+
+def run_sync_view(view, request, *args, **kwargs):
+    """Выполняет представление DRF и рендерит ответ в потоке пула.
+    Соединения с БД потока закрываются по правилам CONN_MAX_AGE, как это
+    делают сигналы начала и конца запроса в режиме WSGI.
+    """
+    close_old_connections()
+    check_connections_on_first_use()
+    try:
+        with measure_queries(current_timings()):
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response = render_response(response)
+        return response
+    finally:
+        close_old_connections()
+
+
+def as_async_view(view):
+    """Асинхронная обёртка представления для ASGI.
+
+    Django 3.2 выполняет синхронные представления под ASGI в одном общем
+    потоке процесса, то есть по одному запросу за раз. Обёртка переносит
+    представление в пул потоков: цикл событий обслуживает медленных
+    клиентов, а запросы к БД выполняются параллельно.
+    """
+    run = sync_to_async(
+        run_sync_view, thread_sensitive=False, executor=_executor
+    )
+
+    async def async_view(request, *args, **kwargs):
+        return await run(view, request, *args, **kwargs)
+
+    async_view.__dict__.update(view.__dict__)
+    async_view.__name__ = view.__name__
+    async_view.__doc__ = view.__doc__
+    return async_view
+
+
+def asynchronous_urls(patterns, basenames):
+    """Заменяет представления маршрутов с указанными basename роутера
+    асинхронными обёртками.
+    """
+    prefixes = tuple(f'{basename}-' for basename in basenames)
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern) and pattern.name and (
+            pattern.name.startswith(prefixes)
+        ):
+            pattern = URLPattern(
+                pattern.pattern,
+                as_async_view(pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+        result.append(pattern)
+    return result
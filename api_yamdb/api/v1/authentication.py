@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.cache import get_cache
+from users.models import User
+
+TOKEN_VERSION_KEY = 'auth:token_version:{}'
+VERSION_CLAIM = 'ver'
+# Версия для удалённых и заблокированных пользователей:
+# не совпадает ни с одной версией в токенах.
+REVOKED = -1
+
+
+class RoleAccessToken(AccessToken):
+    """Токен доступа с ролью, признаком суперпользователя и версией
+    токенов пользователя: разрешения проверяются без запроса к БД.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token[VERSION_CLAIM] = user.token_version
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, восстановленный из подписанных утверждений токена."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+
+def token_version_key(user_id):
+    return TOKEN_VERSION_KEY.format(user_id)
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя. Читается из кеша, при
+    промахе - одним запросом к БД.
+    """
+    cache = get_cache()
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is None:
+            version = REVOKED
+        cache.set(
+            key, version, timeout=settings.TOKEN_VERSION_CACHE_TIMEOUT
+        )
+    return version
+
+
+def forget_token_version(user_id):
+    get_cache().delete(token_version_key(user_id))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT без загрузки пользователя из БД.
+
+    Роль и признак суперпользователя берутся из токена. Смена роли или
+    блокировка увеличивают версию токенов пользователя, и токены со
+    старой версией отклоняются; версия кешируется на
+    TOKEN_VERSION_CACHE_TIMEOUT секунд.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            # Токен выпущен без утверждений о роли.
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if get_token_version(user_id) != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван: роль или статус пользователя изменились.',
+                code='token_revoked'
+            )
+        return RoleTokenUser(validated_token)
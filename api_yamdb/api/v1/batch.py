@@ -0,0 +1,408 @@
+"""Пакетное создание отзывов и комментариев, создание и обновление
+произведений, жанров и категорий.
+
+Элементы пакета проверяются сериализатором без обращений к БД, ссылки на
+пользователей, произведения, отзывы, жанры и категории и уникальность
+сверяются одним запросом на проверку для всего пакета. Новые строки
+записываются одним bulk_create, изменённые - одним bulk_update в той же
+транзакции, рейтинг и статистика обновляются один раз на произведение.
+Результат - статус каждого элемента в порядке запроса.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers, status
+from rest_framework.settings import api_settings
+
+from api.v1.cache import bump_generation_on_commit
+from reviews.aggregates import add_title_scores
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title
+)
+from users.models import User
+
+
+class ReviewBatchItemSerializer(serializers.ModelSerializer):
+    """Отзыв в пакете. Автор по умолчанию - отправитель запроса."""
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(required=False, max_length=150)
+
+    class Meta:
+        model = Review
+        fields = ('title', 'author', 'text', 'score')
+        # Уникальность проверяется для всего пакета сразу.
+        validators = []
+
+
+class CommentBatchItemSerializer(serializers.ModelSerializer):
+    """Комментарий в пакете. Автор по умолчанию - отправитель запроса."""
+    review = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(required=False, max_length=150)
+
+    class Meta:
+        model = Comment
+        fields = ('review', 'author', 'text')
+
+
+class CategoryBatchItemSerializer(serializers.ModelSerializer):
+    """Категория в пакете. Уникальность slug и name проверяется для всего
+    пакета сразу.
+    """
+    name = serializers.CharField(max_length=256)
+    slug = serializers.SlugField(max_length=50)
+
+    class Meta:
+        model = Category
+        fields = ('name', 'slug')
+
+
+class GenreBatchItemSerializer(CategoryBatchItemSerializer):
+    """Жанр в пакете."""
+
+    class Meta:
+        model = Genre
+        fields = ('name', 'slug')
+
+
+class TitleBatchItemSerializer(serializers.ModelSerializer):
+    """Произведение в пакете: жанры и категория - slug."""
+    name = serializers.CharField(max_length=256)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ('name', 'year', 'description', 'genre', 'category')
+
+
+class BatchCreate:
+    """Создание пакета объектов model. Наследники загружают данные для
+    проверки ссылок (load), строят объект элемента или возвращают ошибки
+    (build) и обновляют зависящие от объектов данные (after_insert).
+    Объект, загруженный из БД, сохраняется bulk_update по полям
+    update_fields. key_fields - уникальные поля, по которым находятся
+    идентификаторы вставленных строк.
+    """
+    model = None
+    item_serializer_class = None
+    update_fields = ()
+    key_fields = ()
+    # Если параллельный запрос вставил конфликтующую строку между
+    # проверкой и вставкой, пакет проверяется и вставляется заново.
+    attempts = 2
+
+    def __init__(self, items, user_id):
+        self.items = items
+        self.user_id = user_id
+        self.results = [None] * len(items)
+
+    def run(self):
+        candidates = self.validate_fields()
+        for attempt in range(1, self.attempts + 1):
+            try:
+                with transaction.atomic():
+                    self.insert(self.resolve(candidates))
+            except IntegrityError:
+                if attempt == self.attempts:
+                    raise
+            else:
+                break
+        return self.results
+
+    def validate_fields(self):
+        candidates = []
+        for index, item in enumerate(self.items):
+            serializer = self.item_serializer_class(data=item)
+            if serializer.is_valid():
+                candidates.append((index, serializer.validated_data))
+            else:
+                self.reject(index, serializer.errors)
+        return candidates
+
+    def reject(self, index, errors):
+        self.results[index] = {
+            'index': index,
+            'status': status.HTTP_400_BAD_REQUEST,
+            'errors': errors,
+        }
+
+    def author_ids(self, candidates):
+        usernames = {
+            data['author'] for _, data in candidates if 'author' in data
+        }
+        if not usernames:
+            return {}
+        return dict(User.objects.filter(
+            username__in=usernames
+        ).order_by().values_list('username', 'pk'))
+
+    def resolve(self, candidates):
+        """Элементы с найденными автором и ссылками: (индекс, объект)."""
+        authors = self.author_ids(candidates)
+        rows = []
+        for index, data in candidates:
+            author_id = (
+                authors.get(data['author']) if 'author' in data
+                else self.user_id
+            )
+            if author_id is None:
+                self.reject(index, {'author': ['Пользователь не найден.']})
+            else:
+                rows.append((index, data, author_id))
+        self.load(rows)
+        objects = []
+        for index, data, author_id in rows:
+            instance, errors = self.build(data, author_id)
+            if errors:
+                self.reject(index, errors)
+            else:
+                objects.append((index, instance))
+        return objects
+
+    def insert(self, objects):
+        created = [instance for _, instance in objects if instance.pk is None]
+        updated = [
+            instance for _, instance in objects if instance.pk is not None
+        ]
+        if created:
+            self.model.objects.bulk_create(created)
+            self.load_ids(created)
+        if updated:
+            self.model.objects.bulk_update(updated, self.update_fields)
+        if objects:
+            self.after_insert(created + updated)
+        created = {id(instance) for instance in created}
+        for index, instance in objects:
+            self.results[index] = dict(
+                index=index,
+                status=(
+                    status.HTTP_201_CREATED if id(instance) in created
+                    else status.HTTP_200_OK
+                ),
+                **self.identity(instance)
+            )
+
+    def identity(self, instance):
+        return {'id': instance.pk}
+
+    def load(self, rows):
+        pass
+
+    def build(self, data, author_id):
+        raise NotImplementedError
+
+    def load_ids(self, instances):
+        """Идентификаторы вставленных строк для СУБД, которые не
+        возвращают их из bulk_create (PostgreSQL возвращает).
+        """
+        if not self.key_fields or instances[0].pk is not None:
+            return
+        ids = {
+            row[:-1]: row[-1]
+            for row in self.model.objects.filter(**{
+                f'{field}__in': {
+                    getattr(instance, field) for instance in instances
+                }
+                for field in self.key_fields
+            }).order_by().values_list(*self.key_fields, 'pk')
+        }
+        for instance in instances:
+            instance.pk = ids.get(tuple(
+                getattr(instance, field) for field in self.key_fields
+            ))
+
+    def after_insert(self, instances):
+        pass
+
+
+class ReviewBatch(BatchCreate):
+    model = Review
+    item_serializer_class = ReviewBatchItemSerializer
+    key_fields = ('title_id', 'author_id')
+
+    def load(self, rows):
+        title_ids = {data['title'] for _, data, _ in rows}
+        self.titles = set(Title.objects.filter(
+            pk__in=title_ids
+        ).order_by().values_list('pk', flat=True)) if title_ids else set()
+        # Пары с уже существующими отзывами: один запрос по произведениям
+        # и авторам пакета вместо проверки каждого элемента.
+        self.reviewed = set(Review.objects.filter(
+            title_id__in=self.titles,
+            author_id__in={author_id for _, _, author_id in rows}
+        ).order_by().values_list(
+            'title_id', 'author_id'
+        )) if self.titles else set()
+
+    def build(self, data, author_id):
+        if data['title'] not in self.titles:
+            return None, {'title': ['Произведение не найдено.']}
+        key = (data['title'], author_id)
+        if key in self.reviewed:
+            return None, {api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы не можете создать два отзыва на одно произведение.'
+            ]}
+        self.reviewed.add(key)
+        return Review(
+            title_id=data['title'], author_id=author_id,
+            text=data['text'], score=data['score']
+        ), None
+
+    def after_insert(self, instances):
+        scores = defaultdict(list)
+        last_review = {}
+        for review in instances:
+            scores[review.title_id].append(review.score)
+            last_review[review.title_id] = max(
+                review.pub_date,
+                last_review.get(review.title_id, review.pub_date)
+            )
+        # Строки статистики блокируются в порядке идентификаторов, чтобы
+        # параллельные пакеты не взаимоблокировались.
+        for title_id in sorted(scores):
+            add_title_scores(
+                title_id, scores[title_id], last_review[title_id]
+            )
+        bump_generation_on_commit(Review, Title)
+
+
+class CommentBatch(BatchCreate):
+    """Пакет комментариев. На СУБД, которые не возвращают
+    идентификаторы из bulk_create, id комментариев в ответе - null.
+    """
+    model = Comment
+    item_serializer_class = CommentBatchItemSerializer
+
+    def load(self, rows):
+        review_ids = {data['review'] for _, data, _ in rows}
+        self.reviews = set(Review.objects.filter(
+            pk__in=review_ids
+        ).order_by().values_list('pk', flat=True)) if review_ids else set()
+
+    def build(self, data, author_id):
+        if data['review'] not in self.reviews:
+            return None, {'review': ['Отзыв не найден.']}
+        return Comment(
+            review_id=data['review'], author_id=author_id, text=data['text']
+        ), None
+
+    def after_insert(self, instances):
+        bump_generation_on_commit(Comment)
+
+
+class CategoryBatch(BatchCreate):
+    """Пакет категорий: элемент с существующим slug обновляет название,
+    с новым - создаёт категорию.
+    """
+    model = Category
+    item_serializer_class = CategoryBatchItemSerializer
+    update_fields = ('name',)
+    key_fields = ('slug',)
+
+    def load(self, rows):
+        slugs = {data['slug'] for _, data, _ in rows}
+        names = {data['name'] for _, data, _ in rows}
+        existing = list(self.model.objects.filter(
+            Q(slug__in=slugs) | Q(name__in=names)
+        )) if rows else []
+        self.by_slug = {instance.slug: instance for instance in existing}
+        self.by_name = {instance.name: instance for instance in existing}
+        self.seen = set()
+
+    def build(self, data, author_id):
+        slug, name = data['slug'], data['name']
+        if ('slug', slug) in self.seen or ('name', name) in self.seen:
+            return None, {api_settings.NON_FIELD_ERRORS_KEY: [
+                'slug или name повторяется в пакете.'
+            ]}
+        self.seen.update((('slug', slug), ('name', name)))
+        owner = self.by_name.get(name)
+        if owner is not None and owner.slug != slug:
+            return None, {'name': [
+                f'Название уже используется: {owner.slug}.'
+            ]}
+        instance = self.by_slug.get(slug)
+        if instance is None:
+            return self.model(name=name, slug=slug), None
+        instance.name = name
+        return instance, None
+
+    def identity(self, instance):
+        return {'slug': instance.slug}
+
+    def after_insert(self, instances):
+        bump_generation_on_commit(self.model)
+
+
+class GenreBatch(CategoryBatch):
+    """Пакет жанров."""
+    model = Genre
+    item_serializer_class = GenreBatchItemSerializer
+
+
+class TitleBatch(BatchCreate):
+    """Пакет произведений: элемент с существующим названием обновляет
+    произведение и заменяет его жанры, с новым - создаёт произведение.
+    Жанры и категории ищутся по slug одним запросом IN на пакет, связи
+    с жанрами записываются одним bulk_create.
+    """
+    model = Title
+    item_serializer_class = TitleBatchItemSerializer
+    update_fields = ('year', 'description', 'category')
+    key_fields = ('name',)
+
+    def load(self, rows):
+        self.genres, self.categories, self.existing = {}, {}, {}
+        self.title_genres, self.seen = [], set()
+        if not rows:
+            return
+        items = [data for _, data, _ in rows]
+        self.genres = dict(Genre.objects.filter(
+            slug__in={slug for data in items for slug in data['genre']}
+        ).order_by().values_list('slug', 'pk'))
+        self.categories = dict(Category.objects.filter(
+            slug__in={data['category'] for data in items}
+        ).order_by().values_list('slug', 'pk'))
+        self.existing = {
+            title.name: title for title in Title.objects.filter(
+                name__in={data['name'] for data in items}
+            ).order_by()
+        }
+
+    def build(self, data, author_id):
+        errors = {}
+        missing = [slug for slug in data['genre'] if slug not in self.genres]
+        if missing:
+            errors['genre'] = [f'Жанр не найден: {slug}.' for slug in missing]
+        if data['category'] not in self.categories:
+            errors['category'] = ['Категория не найдена.']
+        if data['name'] in self.seen:
+            errors[api_settings.NON_FIELD_ERRORS_KEY] = [
+                'name повторяется в пакете.'
+            ]
+        if errors:
+            return None, errors
+        self.seen.add(data['name'])
+        title = self.existing.get(data['name']) or Title(name=data['name'])
+        title.year = data['year']
+        title.description = data.get('description')
+        title.category_id = self.categories[data['category']]
+        self.title_genres.append((title, {
+            self.genres[slug] for slug in data['genre']
+        }))
+        return title, None
+
+    def after_insert(self, instances):
+        updated = [
+            title.pk for title in instances
+            if title.name in self.existing
+        ]
+        if updated:
+            GenreTitle.objects.filter(title_id__in=updated).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title_id=title.pk, genre_id=genre_id)
+            for title, genre_ids in self.title_genres
+            for genre_id in sorted(genre_ids)
+        )
+        bump_generation_on_commit(Title, GenreTitle)
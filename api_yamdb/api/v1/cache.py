@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from api.metrics import CACHE_HITS, CACHE_MISSES
+from api.timings import record_cache
+
+GENERATION_KEY = 'api:generation:{}'
+RESPONSE_KEY = 'api:response:{}:{}:{}'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def generation_key(model):
+    return GENERATION_KEY.format(model._meta.label_lower)
+
+
+def new_generation():
+    # Поколение начинается с уникального значения, а не с единицы:
+    # если счётчик вытеснен из кеша, старые ключи не совпадут с новыми.
+    return time.time_ns()
+
+
+def get_generations(models):
+    """Возвращает текущие номера поколений для списка моделей."""
+    cache = get_cache()
+    keys = [generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, new_generation(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(*models):
+    """Увеличивает номер поколения моделей: все закешированные ответы,
+    построенные по их данным, перестают использоваться.
+    """
+    cache = get_cache()
+    for model in models:
+        key = generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), timeout=None)
+
+
+def bump_generation_on_commit(*models):
+    """Откладывает смену поколения до фиксации транзакции, чтобы
+    параллельный запрос не закешировал ещё не зафиксированные данные
+    под новым поколением.
+    """
+    transaction.on_commit(lambda: bump_generation(*models))
+
+
+def response_cache_key(request, prefix, models):
+    """Ключ ответа: хост, путь, нормализованная строка запроса и поколения
+    всех моделей, от которых зависит ответ.
+    """
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    digest = hashlib.md5(
+        f'{request.get_host()}{request.path}?{query}'.encode('utf-8')
+    ).hexdigest()
+    generations = '.'.join(str(gen) for gen in get_generations(models))
+    return RESPONSE_KEY.format(prefix, generations, digest)
+
+
+def get_cached_response(key):
+    data = get_cache().get(key)
+    record_cache(data is not None)
+    (CACHE_HITS if data is not None else CACHE_MISSES).inc()
+    with _stats_lock:
+        _stats['hits' if data is not None else 'misses'] += 1
+    return data
+
+
+def set_cached_response(key, data):
+    get_cache().set(key, data, timeout=settings.API_CACHE_TIMEOUT)
+
+
+def cache_stats():
+    """Статистика попаданий в кеш текущего процесса."""
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / total if total else None
+    return stats
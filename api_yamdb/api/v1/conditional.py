@@ -0,0 +1,29 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def make_etag(*parts):
+    """Строгий ETag из произвольных значений-валидаторов."""
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode('utf-8')
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def set_validators(response, etag):
+    response['ETag'] = etag
+    return response
+
+
+def not_modified_response(request, etag):
+    """Возвращает ответ 304, если ETag клиента совпадает с текущим,
+    иначе None. Last-Modified не отдаётся: время последней записи не
+    меняется при удалении строк и при изменении связанных объектов, и
+    If-Modified-Since вернул бы 304 на устаревшие данные.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        return None
+    return set_validators(response, etag)
@@ -0,0 +1,65 @@
+"""Выборочные поля ответа.
+
+?fields=id,name,rating - в ответе только перечисленные поля.
+?expand=genre - связанные объекты, которые отдаются вложенными; остальные
+связи сериализатора из expandable_fields отдаются своим slug. Без
+параметра expand вложенными отдаются все связи, как и раньше.
+"""
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_list(request, param):
+    """Множество значений параметра через запятую; None - параметра
+    нет.
+    """
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request):
+    return parse_list(request, FIELDS_PARAM)
+
+
+def requested_expansions(request, default):
+    expand = parse_list(request, EXPAND_PARAM)
+    return set(default) if expand is None else expand
+
+
+class SparseFieldsMixin:
+    """Сериализатор, который отдаёт поля из ?fields= и разворачивает связи
+    из ?expand=. expandable_fields - связи, которые можно развернуть, и
+    фабрики полей, которыми они заменяются без разворачивания. Действует
+    только на ответы на чтение: тело запроса на запись проверяется
+    полностью.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+        expand = requested_expansions(request, self.expandable_fields)
+        fields = requested_fields(request)
+        unknown = {
+            FIELDS_PARAM: fields - set(self.fields) if fields else None,
+            EXPAND_PARAM: expand - set(self.expandable_fields),
+        }
+        errors = {
+            param: [f'Неизвестные поля: {", ".join(sorted(names))}.']
+            for param, names in unknown.items() if names
+        }
+        if errors:
+            raise ValidationError(errors)
+        for name, compact in self.expandable_fields.items():
+            if name not in expand and name in self.fields:
+                self.fields[name] = compact()
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
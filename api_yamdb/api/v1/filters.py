@@ -1,6 +1,7 @@
 from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
 
 from reviews.models import Title
+from reviews.search import full_text_search
 
 
 class TitleFilter(FilterSet):
@@ -9,7 +10,14 @@ class TitleFilter(FilterSet):
     genre = CharFilter(field_name='genre__slug')
     name = CharFilter(field_name='name')
     year = NumberFilter(field_name='year')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['category', 'genre', 'name', 'year']
+        fields = ['category', 'genre', 'name', 'year', 'search']
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию, результаты
+        отсортированы по релевантности.
+        """
+        return full_text_search(queryset, value)
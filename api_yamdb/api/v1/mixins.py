@@ -1,4 +1,22 @@
-from rest_framework import mixins, viewsets
+import json
+
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, status, viewsets
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api.v1.cache import (
+    get_cached_response, get_generations, response_cache_key,
+    set_cached_response
+)
+from api.v1.conditional import (
+    make_etag, not_modified_response, set_validators
+)
+from reviews.search import full_text_search, search_terms
 
 
 class CreateListDestroyViewSet(
@@ -8,3 +26,251 @@ class CreateListDestroyViewSet(
     viewsets.GenericViewSet
 ):
     pass
+
+
+class BatchCreateViewSet(viewsets.GenericViewSet):
+    """Пакетная запись: тело запроса - список элементов (не больше
+    BATCH_MAX_ITEMS), ответ 207 Multi-Status со статусом, идентификатором
+    или ошибками каждого элемента в порядке запроса. batch_class -
+    наследник api.v1.batch.BatchCreate.
+    """
+    batch_class = None
+
+    def create(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Передайте непустой список элементов.'
+            ]})
+        if len(items) > settings.BATCH_MAX_ITEMS:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Не больше {settings.BATCH_MAX_ITEMS} элементов в запросе.'
+            ]})
+        results = self.batch_class(items, request.user.id).run()
+        return Response(results, status=status.HTTP_207_MULTI_STATUS)
+
+
+class SearchListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Полнотекстовый поиск по queryset: запрос передаётся в параметре
+    search, результаты отсортированы по релевантности.
+    """
+    search_param = 'search'
+
+    def get_queryset(self):
+        query = self.request.query_params.get(self.search_param)
+        if not search_terms(query):
+            raise ValidationError(
+                {self.search_param: 'Укажите поисковый запрос.'}
+            )
+        return full_text_search(super().get_queryset(), query)
+
+
+class NestedResourceMixin:
+    """Вложенный маршрут: объекты родителя из URL (отзывы произведения,
+    комментарии отзыва). Queryset фильтруется по ключам родителя без его
+    загрузки, поэтому список, объект, изменение и удаление обходятся без
+    отдельного запроса к родителю. Существование родителя проверяется,
+    только если список пуст: пустой список и 404 должны различаться.
+    Сам родитель загружается один раз за запрос и только при создании.
+    parent_lookups - поля родителя и соответствующие им параметры URL.
+    """
+    parent_model = None
+    parent_field = None
+    parent_lookups = {}
+
+    def parent_filter(self):
+        return {
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        }
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_model, **self.parent_filter()
+            )
+        return self._parent
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{
+            f'{self.parent_field}__{field}': value
+            for field, value in self.parent_filter().items()
+        })
+
+    def check_empty_list(self):
+        if not hasattr(self, '_parent') and not (
+            self.parent_model.objects.filter(**self.parent_filter()).exists()
+        ):
+            raise Http404
+
+    def create(self, request, *args, **kwargs):
+        # Родитель загружается до проверки тела запроса: на
+        # несуществующего родителя ответ 404, а не ошибки полей.
+        self.get_parent()
+        return super().create(request, *args, **kwargs)
+
+
+class ResponseCacheMixin:
+    """Кеширует ответы на чтение вместе с их ETag.
+    Ключ кеша включает поколения моделей из versioned_models, поэтому
+    после любой записи в эти модели закешированные ответы не отдаются.
+    При API_CACHE_ENABLED=False ответы не кешируются.
+    """
+    versioned_models = ()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+        key = response_cache_key(
+            request, self.basename, self.versioned_models
+        )
+        cached = get_cached_response(key)
+        if cached is not None:
+            return self.cache_hit_response(request, cached)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_response(key, {
+                'data': response.data,
+                'etag': response.get('ETag'),
+            })
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cache_hit_response(self, request, cached):
+        etag = cached['etag']
+        response = None
+        if etag is not None:
+            response = not_modified_response(request, etag)
+        if response is None:
+            response = Response(cached['data'])
+            if etag is not None:
+                set_validators(response, etag)
+        response['X-Cache'] = 'HIT'
+        return response
+
+
+class CachedListMixin(ResponseCacheMixin):
+    """Кеширует ответ list."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(ResponseCacheMixin):
+    """Кеширует ответ retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Добавляет строгий ETag к ответам на чтение и отвечает 304 Not
+    Modified без сериализации, если ETag клиента совпадает. ETag строится
+    из количества строк и поколений моделей из versioned_models: поколения
+    меняются при любой записи, включая удаление и изменение связанных
+    объектов. Поколения хранятся в кеше ответов; если он отключён (кеш
+    процесса при нескольких воркерах не видит записей в других воркерах),
+    ETag считается по телу ответа.
+    """
+    versioned_models = ()
+
+    def check_empty_list(self):
+        """Вызывается, если в ответе list нет объектов."""
+
+    def get_versions(self):
+        """Поколения versioned_models или None, если они не общие для
+        всех воркеров.
+        """
+        if not settings.API_CACHE_ENABLED:
+            return None
+        return get_generations(self.versioned_models)
+
+    def content_validated(self, request, response):
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        etag = make_etag(request.build_absolute_uri(), json.dumps(
+            response.data, cls=encoders.JSONEncoder, ensure_ascii=False
+        ))
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(response, etag)
+
+    def conditional_response(self, queryset, handler, request,
+                             *args, **kwargs):
+        count = queryset.order_by().count()
+        if not count:
+            if self.action == 'retrieve':
+                return handler(request, *args, **kwargs)
+            self.check_empty_list()
+        versions = self.get_versions()
+        if versions is None:
+            return self.content_validated(
+                request, handler(request, *args, **kwargs)
+            )
+        etag = make_etag(request.build_absolute_uri(), count, *versions)
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_validators(response, etag)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """Условный GET для list. При пагинации по курсору количество строк
+    не считается: ETag строится по ключам первой и последней строки
+    страницы, а сама страница загружается один раз.
+    """
+
+    def use_cursor(self):
+        use_cursor = getattr(self.paginator, 'use_cursor', None)
+        return use_cursor is not None and use_cursor(self.request)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.use_cursor():
+            return self.cursor_conditional_list(request, queryset)
+        return self.conditional_response(
+            queryset, super().list, request, *args, **kwargs
+        )
+
+    def cursor_conditional_list(self, request, queryset):
+        page = self.paginate_queryset(queryset)
+        if not page:
+            self.check_empty_list()
+        versions = self.get_versions()
+        if versions is None:
+            serializer = self.get_serializer(page, many=True)
+            return self.content_validated(
+                request, self.get_paginated_response(serializer.data)
+            )
+        keys = (page[0].pk, page[-1].pk) if page else ()
+        etag = make_etag(
+            request.build_absolute_uri(), len(page), *keys, *versions
+        )
+        response = not_modified_response(request, etag)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(page, many=True)
+        return set_validators(
+            self.get_paginated_response(serializer.data), etag
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """Условный GET для retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional_response(
+            queryset, super().retrieve, request, *args, **kwargs
+        )
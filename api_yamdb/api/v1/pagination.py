@@ -0,0 +1,63 @@
+from rest_framework.pagination import (
+    BasePagination, CursorPagination, PageNumberPagination
+)
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Пагинация по курсору на индексированной сортировке по дате
+    публикации: без OFFSET и без COUNT(*), поэтому время ответа
+    не зависит от глубины страницы.
+    """
+    ordering = ('-pub_date', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """Пагинация по номеру страницы (по умолчанию, для обратной
+    совместимости) или по курсору: ?pagination=cursor для первой
+    страницы, далее ссылки next и previous содержат параметр cursor.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    page_number_class = PageNumberPagination
+    cursor_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.paginator = self.page_number_class()
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.paginator = self.cursor_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def get_schema_fields(self, view):
+        return (
+            self.page_number_class().get_schema_fields(view)
+            + self.cursor_class().get_schema_fields(view)
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.page_number_class().get_schema_operation_parameters(view)
+            + self.cursor_class().get_schema_operation_parameters(view)
+        )
@@ -0,0 +1,27 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from api.v1.renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson, если библиотека установлена. Тело, которое
+    orjson не разобрал (NaN и Infinity, целые больше 64 бит, ошибки
+    синтаксиса), разбирает JSONParser: результат и текст ошибки те же.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context
+            )
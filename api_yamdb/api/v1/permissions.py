@@ -49,7 +49,7 @@ class IsAuthorAdminModeratorOrReadOnly(permissions.BasePermission):
                 or request.user.role == User.ChoicesRole.MODERATOR_ROLE
                 or request.user.role == User.ChoicesRole.ADMIN_ROLE
                 or request.user.is_superuser
-                or obj.author == request.user)
+                or obj.author_id == request.user.id)
 
     def has_permission(self, request, view):
         return (request.method in permissions.SAFE_METHODS
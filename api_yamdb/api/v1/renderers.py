@@ -0,0 +1,47 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Даты orjson кодирует так же, как JSONEncoder DRF (isoformat, UTC - 'Z').
+ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else None
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если библиотека установлена.
+
+    Результат совпадает с ответом JSONRenderer байт в байт: компактные
+    разделители, кириллица без экранирования, экранированные \\u2028 и
+    \\u2029. Decimal и прочие типы, которых нет в JSON, передаются в
+    JSONEncoder DRF, поэтому форматы те же. Отступы (indent) и
+    ensure_ascii orjson не поддерживает - такие ответы, как и данные,
+    которые orjson не кодирует (целые больше 64 бит), рендерит JSONRenderer.
+    Отличие одно: NaN и Infinity orjson записывает как null, а JSONRenderer
+    отказывается их кодировать.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -1,11 +1,17 @@
-from django.shortcuts import get_object_or_404
+from functools import partial
+
+from django.db import IntegrityError
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.v1.fieldsets import SparseFieldsMixin
+from reviews.models import (
+    MIN_SCORE, Category, Comment, Genre, Review, Title, TitleStats
+)
 from users.models import User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Category."""
 
     class Meta:
@@ -13,7 +19,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Genre."""
 
     class Meta:
@@ -21,8 +27,19 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения модели Title."""
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Сериализатор для чтения модели Title. Жанры и категория без
+    разворачивания отдаются своим slug.
+    """
+    expandable_fields = {
+        'genre': partial(
+            serializers.SlugRelatedField,
+            slug_field='slug', many=True, read_only=True
+        ),
+        'category': partial(
+            serializers.SlugRelatedField, slug_field='slug', read_only=True
+        ),
+    }
     genre = GenreSerializer(many=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.IntegerField(
@@ -30,10 +47,34 @@ class TitleSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
         model = Title
 
 
+class TitleStatsSerializer(serializers.Serializer):
+    """Сериализатор статистики оценок произведения."""
+    id = serializers.IntegerField(source='title_id')
+    count = serializers.IntegerField()
+    mean = serializers.FloatField()
+    median = serializers.FloatField()
+    scores = serializers.SerializerMethodField()
+    last_review = serializers.DateTimeField()
+
+    def get_scores(self, stats):
+        return {
+            str(MIN_SCORE + index): number
+            for index, number in enumerate(stats.histogram)
+        }
+
+    def to_representation(self, title):
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            # У произведения ещё нет отзывов.
+            stats = TitleStats(title=title)
+        return super().to_representation(stats)
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для создания модели Title."""
     genre = serializers.SlugRelatedField(
@@ -47,11 +88,11 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating')
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализер отзывов."""
 
     author = serializers.SlugRelatedField(
@@ -64,24 +105,39 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         exclude = ('title',)
 
-    def get_title(self):
-        request = self.context.get('request')
-        return get_object_or_404(
-            Title,
-            pk=request.parser_context.get('kwargs').get('title_id')
-        )
+    def create(self, validated_data):
+        """Уникальность отзыва проверяет ограничение unique_review при
+        вставке, а не отдельный запрос перед ней: повторный отзыв
+        встречается редко, и только на нём выполняется запрос, отличающий
+        его от других нарушений целостности.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if Review.objects.filter(
+                title=validated_data['title'],
+                author_id=validated_data['author_id']
+            ).exists():
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Вы не можете создать два отзыва на одно'
+                        ' произведение.'
+                    ]
+                })
+            raise
+
+
+class ReviewSearchSerializer(ReviewSerializer):
+    """Сериализатор результатов поиска по отзывам."""
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
+    rank = serializers.FloatField(source='search_rank', read_only=True)
 
-    def validate(self, attrs):
-        if self.context.get('request').method == 'POST':
-            user = self.context.get('request').user
-            if Review.objects.filter(author=user, title=self.get_title()):
-                raise serializers.ValidationError(
-                    'Вы не можете создать два отзыва на одно произведение.'
-                )
-        return super().validate(attrs)
+    class Meta:
+        model = Review
+        fields = '__all__'
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор комментариев к отзывам."""
 
     author = serializers.SlugRelatedField(
@@ -95,6 +151,17 @@ class CommentSerializer(serializers.ModelSerializer):
         exclude = ('review',)
 
 
+class CommentSearchSerializer(CommentSerializer):
+    """Сериализатор результатов поиска по комментариям."""
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+    rank = serializers.FloatField(source='search_rank', read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = '__all__'
+
+
 class AdminSerializer(serializers.ModelSerializer):
     """Сериализатор для модели User.
     Права доступа: Администратор.
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+_lock = threading.Lock()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов по алгоритму GCRA - эквиваленту
+    маркерной корзины: сразу допускается до num_requests запросов,
+    затем по одному запросу каждые duration / num_requests секунд.
+
+    Для ключа хранится одно значение - теоретическое время следующего
+    запроса - в кеше THROTTLE_CACHE_ALIAS. Проверка не обращается к БД.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        interval = self.duration / self.num_requests
+        burst = self.duration - interval
+        # Блокировка защищает счётчик от гонок между потоками процесса;
+        # в общем кеше параллельные процессы могут изредка пропустить
+        # лишний запрос сверх лимита.
+        with _lock:
+            now = self.timer()
+            arrival = max(self.cache.get(self.key, now), now)
+            self.retry_after = arrival - now - burst
+            if self.retry_after > 0:
+                return False
+            self.cache.set(
+                self.key, arrival + interval,
+                timeout=int(arrival + interval - now) + 1
+            )
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+    def get_cache_key(self, request, view):
+        ident = self.get_request_ident(request)
+        if not ident:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def get_request_ident(self, request):
+        raise NotImplementedError
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Лимит запросов к signup и get_token с одного IP-адреса."""
+    scope = 'auth_ip'
+
+    def get_request_ident(self, request):
+        return self.get_ident(request)
+
+
+class FieldThrottle(TokenBucketThrottle):
+    """Лимит по значению поля запроса; запросы без поля не
+    ограничиваются этим лимитом.
+    """
+    field = None
+
+    def get_request_ident(self, request):
+        value = request.data.get(self.field)
+        if not isinstance(value, str):
+            return None
+        # Значение из запроса не подставляется в ключ кеша как есть.
+        return hashlib.md5(
+            value.strip().lower().encode('utf-8')
+        ).hexdigest()
+
+
+class UsernameThrottle(FieldThrottle):
+    scope = 'auth_username'
+    field = 'username'
+
+
+class EmailThrottle(FieldThrottle):
+    scope = 'auth_email'
+    field = 'email'
@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from api.v1.asynchronous import asynchronous_urls
 from api.v1.views import (
-    CategoryViewSet, CommentsViewSet, GenreViewSet, ReviewsViewSet,
-    TitleViewSet, UserViewSet, signup, get_token
+    CategoryBatchViewSet, CategoryViewSet, CommentBatchViewSet,
+    CommentSearchViewSet, CommentsViewSet, GenreBatchViewSet, GenreViewSet,
+    ReviewBatchViewSet, ReviewSearchViewSet, ReviewsViewSet,
+    TitleBatchViewSet, TitleViewSet, UserViewSet,
+    get_cache_stats, get_timings, get_token, signup
 )
 
 app_name = 'api'
@@ -20,6 +25,27 @@ router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     CommentsViewSet, basename='comments'
 )
+router_v1.register(
+    'batch/categories', CategoryBatchViewSet, basename='batch-categories'
+)
+router_v1.register(
+    'batch/genres', GenreBatchViewSet, basename='batch-genres'
+)
+router_v1.register(
+    'batch/titles', TitleBatchViewSet, basename='batch-titles'
+)
+router_v1.register(
+    'batch/reviews', ReviewBatchViewSet, basename='batch-reviews'
+)
+router_v1.register(
+    'batch/comments', CommentBatchViewSet, basename='batch-comments'
+)
+router_v1.register(
+    'search/reviews', ReviewSearchViewSet, basename='search-reviews'
+)
+router_v1.register(
+    'search/comments', CommentSearchViewSet, basename='search-comments'
+)
 router_v1.register(r'users', UserViewSet)
 
 url_auth = [
@@ -27,7 +53,17 @@ url_auth = [
     path('token/', get_token, name='get_token')
 ]
 
+router_urls = router_v1.urls
+if settings.SERVER_MODE == 'asgi':
+    router_urls = asynchronous_urls(router_urls, (
+        'titles', 'categories', 'genres', 'reviews', 'comments',
+        'batch-categories', 'batch-genres', 'batch-titles',
+        'batch-reviews', 'batch-comments'
+    ))
+
 urlpatterns = [
-    path('v1/', include(router_v1.urls)),
+    path('v1/', include(router_urls)),
     path('v1/auth/', include(url_auth)),
+    path('v1/cache/stats/', get_cache_stats, name='cache_stats'),
+    path('v1/metrics/timings/', get_timings, name='timings'),
 ]
@@ -1,35 +1,61 @@
 from django.contrib.auth.tokens import default_token_generator
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.pagination import (
-    LimitOffsetPagination, PageNumberPagination
+from rest_framework.decorators import (
+    action, api_view, authentication_classes, permission_classes,
+    throttle_classes
 )
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
-from api.v1.mixins import CreateListDestroyViewSet
+from api.timings import endpoint_timings
+from api.v1.authentication import RoleAccessToken
+from api.v1.batch import (
+    CategoryBatch, CommentBatch, GenreBatch, ReviewBatch, TitleBatch
+)
+from api.v1.cache import cache_stats
+from api.v1.mixins import (
+    BatchCreateViewSet, CachedListMixin, CachedRetrieveMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin, CreateListDestroyViewSet, NestedResourceMixin,
+    SearchListViewSet
+)
+from api.v1.pagination import PageNumberOrCursorPagination
 from api.v1.permissions import (
     IsAdmin, IsAuthorAdminModeratorOrReadOnly, IsAdminOrReadOnly,
 )
 from api.v1.serializers import (
     AdminSerializer, CategorySerializer,
-    CommentSerializer, GenerateCodeSerializer,
-    GenreSerializer, ReviewSerializer,
-    TitleCreateSerializer, TitleSerializer,
+    CommentSearchSerializer, CommentSerializer, GenerateCodeSerializer,
+    GenreSerializer, ReviewSearchSerializer, ReviewSerializer,
+    TitleCreateSerializer, TitleSerializer, TitleStatsSerializer,
     TokenSerializer, UserSerializer
 )
+from api.v1.fieldsets import requested_expansions, requested_fields
 from api.v1.filters import TitleFilter
-from reviews.models import Category, Genre, Review, Title
+from api.v1.throttling import EmailThrottle, IPThrottle, UsernameThrottle
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title
+)
 from users.models import User
+from users.outbox import queue_mail
+
+# Столбцы произведения, которые можно не читать, если их нет в ?fields=.
+TITLE_COLUMNS = frozenset(
+    field.name for field in Title._meta.concrete_fields
+    if not field.is_relation
+)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(
+    CachedListMixin, ConditionalListMixin, CreateListDestroyViewSet
+):
     """Получение списка категорий, создание и удаление категории."""
+    versioned_models = (Category,)
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -39,8 +65,11 @@ class CategoryViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(
+    CachedListMixin, ConditionalListMixin, CreateListDestroyViewSet
+):
     """Получение списка жанров, создание и удаление жанра."""
+    versioned_models = (Genre,)
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -50,71 +79,180 @@ class GenreViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    CachedListMixin, CachedRetrieveMixin,
+    ConditionalListMixin, ConditionalRetrieveMixin,
+    viewsets.ModelViewSet
+):
     """Получение списка произведений, одного произведения.
     Создание, изменение и удаление произведения.
     """
+    versioned_models = (Title, Genre, Category, GenreTitle)
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     serializer_class = TitleSerializer
     pagination_class = LimitOffsetPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
+    def get_queryset(self):
+        if self.action in ('stats', 'stats_list'):
+            return Title.objects.select_related('stats')
+        if self.action in ('list', 'retrieve'):
+            return self.sparse_queryset()
+        return super().get_queryset()
+
+    def sparse_queryset(self):
+        """Произведения только с полями из ?fields=: остальные столбцы не
+        читаются, а категория и жанры загружаются, только если они нужны
+        в ответе, и без разворачивания - только их slug.
+        """
+        fields = requested_fields(self.request)
+        expand = requested_expansions(
+            self.request, TitleSerializer.expandable_fields
+        )
+        queryset = Title.objects.all()
+        if not fields:
+            fields = TITLE_COLUMNS | {'genre', 'category'}
+        columns = {'id'} | (fields & TITLE_COLUMNS)
+        if 'category' in fields:
+            queryset = queryset.select_related('category')
+            columns |= {'category__slug'} | (
+                {'category__name'} if 'category' in expand else set()
+            )
+        if 'genre' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'genre', queryset=Genre.objects.only(
+                    'slug', *(['name'] if 'genre' in expand else [])
+                )
+            ))
+        return queryset.only(*columns)
+
     def get_serializer_class(self):
         if self.action in ("retrieve", "list"):
             return TitleSerializer
+        if self.action in ('stats', 'stats_list'):
+            return TitleStatsSerializer
         return TitleCreateSerializer
 
+    @action(detail=True, url_path='stats', methods=['get'])
+    def stats(self, request, pk=None):
+        """Распределение оценок, среднее, медиана, количество отзывов и
+        дата последнего отзыва произведения.
+        """
+        return self.cached_response(self.title_stats, request)
+
+    @action(detail=False, url_path='stats', methods=['get'])
+    def stats_list(self, request):
+        """Статистика оценок для страницы произведений одним запросом."""
+        return self.cached_response(self.titles_stats, request)
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+    def title_stats(self, request):
+        serializer = self.get_serializer(self.get_object())
+        return Response(serializer.data)
+
+    def titles_stats(self, request):
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ReviewsViewSet(
+    NestedResourceMixin, ConditionalListMixin, ConditionalRetrieveMixin,
+    viewsets.ModelViewSet
+):
     """
     Получение списка отзывов, одного отзыва. Создание отзыва.
     Изменение и удаление отзыва.
     """
-
+    versioned_models = (Review, User)
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = {'pk': 'title_id'}
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
     permission_classes = (IsAuthorAdminModeratorOrReadOnly,)
 
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
-            title=self.get_title()
+            author_id=self.request.user.id,
+            title=self.get_parent()
         )
 
-    def get_queryset(self):
-        return self.get_title().reviews.all()
-
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(
+    NestedResourceMixin, ConditionalListMixin, ConditionalRetrieveMixin,
+    viewsets.ModelViewSet
+):
     """
     Получение списка комментариев к отзыву, одного комментария.
     Создание комментария. Изменение и удаление комментария.
     """
-
+    versioned_models = (Comment, User)
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = PageNumberOrCursorPagination
     permission_classes = (IsAuthorAdminModeratorOrReadOnly, )
 
-    def get_review(self):
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
-
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
-            review=self.get_review()
+            author_id=self.request.user.id,
+            review=self.get_parent()
         )
 
-    def get_queryset(self):
-        return self.get_review().comments.all()
+
+class CategoryBatchViewSet(BatchCreateViewSet):
+    """Пакетное создание и обновление категорий по slug."""
+    permission_classes = (IsAdmin,)
+    batch_class = CategoryBatch
+
+
+class GenreBatchViewSet(BatchCreateViewSet):
+    """Пакетное создание и обновление жанров по slug."""
+    permission_classes = (IsAdmin,)
+    batch_class = GenreBatch
+
+
+class TitleBatchViewSet(BatchCreateViewSet):
+    """Пакетное создание и обновление произведений по названию."""
+    permission_classes = (IsAdmin,)
+    batch_class = TitleBatch
+
+
+class ReviewBatchViewSet(BatchCreateViewSet):
+    """Пакетное создание отзывов для импорта и модерации."""
+    permission_classes = (IsAdmin,)
+    batch_class = ReviewBatch
+
+
+class CommentBatchViewSet(BatchCreateViewSet):
+    """Пакетное создание комментариев для импорта и модерации."""
+    permission_classes = (IsAdmin,)
+    batch_class = CommentBatch
+
+
+class ReviewSearchViewSet(SearchListViewSet):
+    """Полнотекстовый поиск по текстам отзывов."""
+    permission_classes = (permissions.AllowAny,)
+    queryset = Review.objects.select_related('author')
+    serializer_class = ReviewSearchSerializer
+    pagination_class = LimitOffsetPagination
+
+
+class CommentSearchViewSet(SearchListViewSet):
+    """Полнотекстовый поиск по текстам комментариев."""
+    permission_classes = (permissions.AllowAny,)
+    queryset = Comment.objects.select_related('author', 'review')
+    serializer_class = CommentSearchSerializer
+    pagination_class = LimitOffsetPagination
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -143,12 +281,14 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(permissions.IsAuthenticated,)
     )
     def show_user_profile(self, request):
+        # Пользователь из токена не хранит профиль, он загружается из БД.
+        user = get_object_or_404(User, pk=request.user.id)
         if request.method == "GET":
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
         if request.method == "PATCH":
             serializer = UserSerializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True
             )
@@ -159,10 +299,14 @@ class UserViewSet(viewsets.ModelViewSet):
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([IPThrottle, UsernameThrottle, EmailThrottle])
+@transaction.atomic
 def signup(request):
     """Получение кода подтверждения на переданный email.
     Получение кода подтверждения уже зарегистрированному пользователю.
+    Письмо ставится в очередь в той же транзакции, что и пользователь.
     """
     serializer = GenerateCodeSerializer(data=request.data)
     username = request.data.get('username')
@@ -186,27 +330,45 @@ def signup(request):
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([IPThrottle, UsernameThrottle])
 def get_token(request):
-    """Получение JWT-токена в обмен на username и confirmation code."""
+    """Получение JWT-токена в обмен на username и confirmation code.
+    Аутентификация не выполняется: отозванный токен не мешает получить
+    новый.
+    """
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data["username"]
     code = serializer.validated_data["confirmation_code"]
     user = get_object_or_404(User, username=username)
     if default_token_generator.check_token(user, code):
-        token = AccessToken.for_user(user)
+        token = RoleAccessToken.for_user(user)
         return Response({"token": str(token)}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 def send_confirmation_code(user):
-    """Получение кода и отправка письма."""
+    """Получение кода и постановка письма в очередь на отправку."""
     confirmation_code = default_token_generator.make_token(user)
-    return send_mail(
+    return queue_mail(
         'Ваш код подтверждения',
         f'Код подтверждения для {user.username} : {confirmation_code}.',
         'from@yambd.com',
         [user.email],
-        fail_silently=False,
     )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def get_cache_stats(request):
+    """Статистика попаданий в кеш ответов каталога."""
+    return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def get_timings(request):
+    """Перцентили времени обработки запросов по эндпоинтам."""
+    return Response(endpoint_timings(), status=status.HTTP_200_OK)
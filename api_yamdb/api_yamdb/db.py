@@ -0,0 +1,39 @@
+from types import MethodType
+
+from django.db import connections
+
+
+def ensure_usable_connection(connection):
+    """ensure_connection соединения с отложенной проверкой: сохранённое
+    соединение проверяется при первом обращении к БД в запросе, а не при
+    его начале. Запросы, которые отдаются из кеша или ответом 304, к БД не
+    обращаются и проверку не выполняют.
+    """
+    if connection.health_check_pending:
+        connection.health_check_pending = False
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+    type(connection).ensure_connection(connection)
+
+
+def check_connections_on_first_use():
+    """Помечает сохранённые соединения с БД для проверки при первом
+    обращении в запросе: упавшее (перезапуск СУБД или пулера, обрыв по
+    таймауту) закрывается и открывается заново. Django 3.2 проверяет
+    постоянное соединение только после ошибки в нём, поэтому без проверки
+    первый запрос после обрыва завершается ошибкой 500.
+    """
+    for connection in connections.all():
+        if connection.connection is None or not (
+            connection.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            continue
+        connection.health_check_pending = True
+        if 'ensure_connection' not in vars(connection):
+            connection.ensure_connection = MethodType(
+                ensure_usable_connection, connection
+            )
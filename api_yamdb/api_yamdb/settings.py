@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +44,12 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api_yamdb.urls'
 
+# Режим запуска: wsgi - синхронные воркеры gunicorn, asgi - воркеры
+# uvicorn; в режиме asgi представления каталога, отзывов и комментариев
+# выполняются в пуле из ASGI_VIEW_THREADS потоков на процесс.
+SERVER_MODE = os.getenv('SERVER_MODE', default='wsgi')
+ASGI_VIEW_THREADS = int(os.getenv('ASGI_VIEW_THREADS', default=8))
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
@@ -72,9 +79,115 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Соединение живёт DB_CONN_MAX_AGE секунд и переиспользуется
+        # следующими запросами того же потока; 0 - новое соединение на
+        # каждый запрос. При первом обращении в запросе сохранённое
+        # соединение проверяется (DB_CONN_HEALTH_CHECKS), упавшее -
+        # переоткрывается.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='true'
+        ).lower() == 'true',
+    }
+}
+# DB_POOL=pgbouncer - подключение через PgBouncer в режиме пула
+# транзакций: серверные курсоры (QuerySet.iterator) не переживают
+# смену серверного соединения между транзакциями и отключаются.
+DB_POOL = os.getenv('DB_POOL', default='')
+if DB_POOL == 'pgbouncer':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# Cache
+# Локальный LRU-кеш процесса подходит для одного процесса (runserver,
+# тесты). В docker-compose по умолчанию используется общий Redis:
+# CACHE_BACKEND=django_redis.cache.RedisCache
+# CACHE_LOCATION=redis://redis:6379/0
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', default=LOCMEM_CACHE)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', default='api_yamdb'),
     }
 }
+if CACHE_BACKEND == LOCMEM_CACHE:
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=1000)),
+    }
+
+# Счётчики ограничения частоты запросов. По умолчанию хранятся в том же
+# кеше, что и ответы, под отдельным префиксом ключей.
+THROTTLE_CACHE_BACKEND = os.getenv(
+    'THROTTLE_CACHE_BACKEND', default=CACHE_BACKEND
+)
+CACHES['throttle'] = {
+    'BACKEND': THROTTLE_CACHE_BACKEND,
+    'LOCATION': os.getenv(
+        'THROTTLE_CACHE_LOCATION',
+        default=CACHES['default']['LOCATION'] + (
+            '-throttle' if THROTTLE_CACHE_BACKEND == LOCMEM_CACHE else ''
+        )
+    ),
+    'KEY_PREFIX': 'throttle',
+}
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+# Кеш ответов каталога (произведения, категории, жанры). gunicorn.conf.py
+# отключает его, если воркеров несколько, а кеш - память процесса: запись
+# сбрасывала бы закешированные ответы только в одном воркере.
+API_CACHE_ALIAS = 'default'
+API_CACHE_ENABLED = os.getenv(
+    'API_CACHE_ENABLED', default='true'
+).lower() in ('1', 'true', 'yes')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+
+# Замеры запросов: доля замеряемых запросов, доля замеров, которые
+# пишутся в журнал api.timings, заголовок Server-Timing в ответе и размер
+# скользящего окна замеров каждого эндпоинта.
+TIMING_SAMPLE_RATE = float(os.getenv('TIMING_SAMPLE_RATE', default=1))
+TIMING_LOG_SAMPLE_RATE = float(
+    os.getenv('TIMING_LOG_SAMPLE_RATE', default=0.1)
+)
+SERVER_TIMING_HEADER = os.getenv(
+    'SERVER_TIMING_HEADER', default='true'
+).lower() == 'true'
+TIMING_WINDOW = int(os.getenv('TIMING_WINDOW', default=1000))
+# Журнал медленных запросов к БД (api.slow_queries): запросы дольше
+# порога в миллисекундах пишутся в файл; 0 - журнал выключен.
+SLOW_QUERY_THRESHOLD_MS = float(
+    os.getenv('SLOW_QUERY_THRESHOLD_MS', default=100)
+)
+SLOW_QUERY_LOG = os.getenv(
+    'SLOW_QUERY_LOG', default=os.path.join(BASE_DIR, 'slow_queries.jsonl')
+)
+# Метрики Prometheus на /metrics (api.metrics).
+METRICS_ENABLED = os.getenv(
+    'METRICS_ENABLED', default='true'
+).lower() == 'true'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'timings': {'format': '%(asctime)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'timings': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'timings',
+        },
+    },
+    'loggers': {
+        'api.timings': {
+            'handlers': ['timings'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
 
 
 # Password validation
@@ -123,7 +236,18 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.StatelessJWTAuthentication',
+    ],
+
+    # JSON на orjson, если он установлен, иначе на модуле json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.v1.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
@@ -132,6 +256,22 @@ REST_FRAMEWORK = {
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 3,
+
+    # Количество прокси перед приложением (nginx в docker-compose). Адрес
+    # клиента для лимитов - тот, что добавил в X-Forwarded-For последний
+    # прокси; значения, присланные самим клиентом, не учитываются.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
+
+    # Лимиты для signup и get_token; пустое значение отключает лимит.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP', default='30/min') or None,
+        'auth_username': (
+            os.getenv('THROTTLE_AUTH_USERNAME', default='5/min') or None
+        ),
+        'auth_email': (
+            os.getenv('THROTTLE_AUTH_EMAIL', default='5/min') or None
+        ),
+    },
 }
 
 AUTH_USER_MODEL = 'users.User'
@@ -141,5 +281,39 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Сколько секунд версия токенов пользователя хранится в кеше. Изменение
+# пользователя сбрасывает её сразу, но в кеше одного процесса (locmem)
+# другие процессы увидят новую версию только через это время.
+TOKEN_VERSION_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', default=60)
+)
+
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND',
+    default='django.core.mail.backends.filebased.EmailBackend'
+)
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+EMAIL_HOST = os.getenv('EMAIL_HOST', default='localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', default=25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', default='') == 'True'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', default=30))
+
+# Письма ставятся в очередь (users.EmailOutbox) и отправляются
+# командой send_outbox: пачками по OUTBOX_BATCH_SIZE через одно
+# SMTP-соединение, с повтором через OUTBOX_RETRY_DELAY * 2^попытка секунд.
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', default=100))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', default=5))
+OUTBOX_RETRY_DELAY = int(os.getenv('OUTBOX_RETRY_DELAY', default=30))
+OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', default=2))
+# Пачка забирается на OUTBOX_CLAIM_TIMEOUT секунд: письма отправляются вне
+# транзакции. Отправленные письма хранятся OUTBOX_RETENTION секунд.
+OUTBOX_CLAIM_TIMEOUT = int(os.getenv('OUTBOX_CLAIM_TIMEOUT', default=300))
+OUTBOX_RETENTION = int(
+    os.getenv('OUTBOX_RETENTION', default=7 * 24 * 60 * 60)
+)
+
+# Пакетная запись (POST /api/v1/batch/<titles, genres, categories, reviews,
+# comments>/): не больше BATCH_MAX_ITEMS элементов в запросе.
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', default=500))
@@ -0,0 +1,196 @@
+"""Настройки gunicorn. Файл подхватывается автоматически при запуске
+gunicorn из каталога проекта; любое значение можно переопределить
+переменной окружения GUNICORN_<НАСТРОЙКА>.
+
+Количество воркеров по умолчанию рассчитывается по числу доступных
+процессоров (2 * CPU + 1) и ограничивается памятью контейнера: на
+воркер отводится GUNICORN_WORKER_MEMORY_MB мегабайт, воркерам
+достаётся не больше трёх четвертей лимита.
+"""
+import os
+import time
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi')
+
+
+def env(name, default, cast=str):
+    value = os.getenv(f'GUNICORN_{name}')
+    if value in (None, ''):
+        return default
+    if cast is bool:
+        return value.lower() in ('1', 'true', 'yes')
+    return cast(value)
+
+
+def cpu_count():
+    """Количество процессоров, доступных процессу, с учётом квоты
+    cgroup (ограничение cpus в docker).
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != 'max':
+            count = min(count, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def memory_limit_mb():
+    """Лимит памяти контейнера (cgroup v2 и v1) или объём памяти машины."""
+    for path in ('/sys/fs/cgroup/memory.max',
+                 '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as limit:
+                value = limit.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1 << 20)
+    try:
+        return (
+            os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+            // (1 << 20)
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def default_workers():
+    workers = 2 * cpu_count() + 1
+    memory = memory_limit_mb()
+    if not memory:
+        return workers
+    per_worker = env('WORKER_MEMORY_MB', 150, int)
+    return min(workers, max(1, memory * 3 // 4 // per_worker))
+
+
+bind = env('BIND', '0.0.0.0:8000')
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'api_yamdb.asgi:application'
+    worker_class = env('WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
+    threads = 1
+else:
+    wsgi_app = 'api_yamdb.wsgi:application'
+    # Потоки позволяют воркеру обслуживать несколько запросов, пока
+    # другие ждут БД; при threads > 1 gunicorn использует gthread.
+    threads = env('THREADS', 2, int)
+    worker_class = env('WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+workers = env('WORKERS', default_workers(), int)
+
+# Приложение загружается в мастер-процессе до fork: воркеры разделяют
+# память с кодом и данными модулей по принципу copy-on-write.
+preload_app = env('PRELOAD', True, bool)
+
+# Воркер перезапускается после max_requests запросов (со случайным
+# разбросом, чтобы воркеры не перезапускались одновременно): утечки
+# памяти не накапливаются.
+max_requests = env('MAX_REQUESTS', 2000, int)
+max_requests_jitter = env('MAX_REQUESTS_JITTER', max_requests // 10, int)
+
+timeout = env('TIMEOUT', 30, int)
+graceful_timeout = env('GRACEFUL_TIMEOUT', 30, int)
+# Соединение от nginx держится открытым между запросами.
+keepalive = env('KEEPALIVE', 5, int)
+# Файл контрольного сигнала воркера в памяти, а не на диске контейнера.
+worker_tmp_dir = env(
+    'WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None
+)
+
+loglevel = env('LOGLEVEL', 'info')
+accesslog = env('ACCESSLOG', None)
+errorlog = env('ERRORLOG', '-')
+
+# Каталог, в который воркеры пишут метрики Prometheus; эндпоинт /metrics
+# любого воркера складывает значения всех процессов. Переменная окружения
+# задаётся до загрузки приложения.
+prometheus_dir = os.getenv(
+    'PROMETHEUS_MULTIPROC_DIR',
+    env('PROMETHEUS_DIR', '/dev/shm/prometheus'
+        if os.path.isdir('/dev/shm') else '/tmp/prometheus')
+)
+raw_env = [f'PROMETHEUS_MULTIPROC_DIR={prometheus_dir}']
+
+# Кеш в памяти процесса у каждого воркера свой: запись сбросила бы
+# закешированные ответы только в воркере, который её выполнил, а
+# остальные отдавали бы устаревшие страницы. Кеш ответов работает
+# с несколькими воркерами только на общем кеше (Redis).
+local_cache = os.getenv('CACHE_BACKEND', 'LocMemCache').endswith(
+    'LocMemCache'
+)
+if workers > 1 and local_cache:
+    raw_env.append('API_CACHE_ENABLED=false')
+os.makedirs(prometheus_dir, exist_ok=True)
+
+# Счётчики событий жизненного цикла воркеров; ведутся в мастер-процессе.
+worker_events = {'started': 0, 'exited': 0}
+
+
+def on_starting(server):
+    # Файлы метрик прошлого запуска сервера.
+    for name in os.listdir(prometheus_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(prometheus_dir, name))
+    server.log.info(
+        'Режим %s, воркеров: %s (%s), потоков: %s, preload: %s',
+        SERVER_MODE, workers, worker_class, threads, preload_app
+    )
+    if 'API_CACHE_ENABLED=false' in raw_env:
+        server.log.warning(
+            'Кеш ответов отключён: CACHE_BACKEND не общий для воркеров'
+        )
+
+
+def pre_fork(server, worker):
+    worker_events['started'] += 1
+
+
+def post_fork(server, worker):
+    # Соединения, открытые в мастере при загрузке приложения, не должны
+    # использоваться несколькими процессами.
+    if preload_app:
+        from django.core.cache import caches
+        from django.db import connections
+
+        connections.close_all()
+        for cache in caches.all():
+            cache.close()
+    worker.started_at = time.monotonic()
+    from api.metrics import WORKER_STARTS, WORKERS
+
+    WORKER_STARTS.inc()
+    WORKERS.set(1)
+
+
+def worker_exit(server, worker):
+    from api.metrics import WORKER_EXITS
+
+    WORKER_EXITS.labels('exit').inc()
+    server.log.info(
+        'Воркер %s останавливается: обработано запросов %s за %.0f с',
+        worker.pid, worker.nr,
+        time.monotonic() - getattr(worker, 'started_at', time.monotonic())
+    )
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    # Значения gauge завершённого воркера больше не учитываются.
+    multiprocess.mark_process_dead(worker.pid, prometheus_dir)
+    worker_events['exited'] += 1
+    server.log.info(
+        'Воркер %s завершён, события воркеров: %s',
+        worker.pid, worker_events
+    )
+
+
+def worker_abort(worker):
+    from api.metrics import WORKER_EXITS
+
+    WORKER_EXITS.labels('abort').inc()
+    worker.log.warning('Воркер %s прерван по таймауту', worker.pid)
@@ -2,9 +2,24 @@ from django.contrib import admin
 
 from users.models import User
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.search import full_text_search
 
 
-class TitleAdmin(admin.ModelAdmin):
+class FullTextSearchMixin:
+    """Поиск в админ-панели по полнотекстовому индексу вместо
+    последовательного сканирования с ILIKE. Ищется только по полям
+    search_fields.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return full_text_search(
+            queryset, search_term, fields=self.search_fields
+        ), False
+
+
+class TitleAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Класс для работы с произведениями в админ-панели."""
     list_display = ('pk', 'name', 'year', 'description', 'category',)
     list_editable = ('category',)
@@ -38,13 +53,13 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
 
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Класс для рабоыт с отзывами в админ-панели."""
     list_display = ('title', 'author', 'text', 'score', 'pub_date')
     search_fields = ('text', )
 
 
-class CommentsAdmin(admin.ModelAdmin):
+class CommentsAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Класс для рабоыт с комментариями в админ-панели."""
     list_display = ('review', 'author', 'text', 'pub_date')
     search_fields = ('text', )
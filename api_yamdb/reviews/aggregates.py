@@ -0,0 +1,155 @@
+from django.db import transaction
+from django.db.models import (
+    Case, Count, F, FloatField, Max, Q, Sum, Value, When
+)
+from django.db.models.functions import Cast
+
+from reviews.models import (
+    MIN_SCORE, Review, Title, TitleStats, empty_histogram
+)
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """Инкрементально изменяет сумму, количество оценок и рейтинг
+    произведения одним UPDATE без чтения отзывов.
+    """
+    if not score_delta and not count_delta:
+        return
+    rating_sum = F('rating_sum') + score_delta
+    rating_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=Case(
+            When(
+                Q(rating_count__lte=-count_delta),
+                then=Value(None, output_field=FloatField())
+            ),
+            default=(
+                Cast(rating_sum, FloatField())
+                / Cast(rating_count, FloatField())
+            ),
+            output_field=FloatField()
+        )
+    )
+
+
+def recalculate_ratings(titles=None, fix=True):
+    """Пересчитывает рейтинг произведений по отзывам с нуля.
+    Возвращает список расхождений (произведение, сохранённые значения,
+    фактические значения). При fix=True расхождения исправляются.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    titles = titles.annotate(
+        actual_sum=Sum('reviews__score'),
+        actual_count=Count('reviews'),
+    ).order_by('pk')
+    drift = []
+    for title in titles.iterator():
+        actual_sum = title.actual_sum or 0
+        actual_count = title.actual_count
+        actual_rating = (
+            actual_sum / actual_count if actual_count else None
+        )
+        if (
+            title.rating_sum == actual_sum
+            and title.rating_count == actual_count
+            and title.rating == actual_rating
+        ):
+            continue
+        drift.append((
+            title,
+            (title.rating_sum, title.rating_count, title.rating),
+            (actual_sum, actual_count, actual_rating),
+        ))
+        title.rating_sum = actual_sum
+        title.rating_count = actual_count
+        title.rating = actual_rating
+    if fix and drift:
+        Title.objects.bulk_update(
+            [title for title, _, _ in drift],
+            ['rating_sum', 'rating_count', 'rating'],
+            batch_size=500
+        )
+    return drift
+
+
+def update_title_stats(title_id, score=None, old_score=None,
+                       pub_date=None, old_pub_date=None):
+    """Добавляет в статистику произведения оценку score и убирает
+    old_score. Строка статистики блокируется до конца транзакции, чтобы
+    параллельные отзывы на то же произведение не потеряли изменения.
+    """
+    if score == old_score and old_pub_date is None:
+        return
+    stats = TitleStats.objects.select_for_update().filter(
+        title_id=title_id
+    ).first()
+    if stats is None:
+        if score is None:
+            # Строки нет, например, при каскадном удалении произведения.
+            return
+        stats, _ = TitleStats.objects.select_for_update().get_or_create(
+            title_id=title_id
+        )
+    if old_score is not None:
+        stats.add_score(old_score, -1)
+    if score is not None:
+        stats.add_score(score)
+    if pub_date is not None and (
+        stats.last_review is None or pub_date > stats.last_review
+    ):
+        stats.last_review = pub_date
+    elif old_pub_date is not None and old_pub_date == stats.last_review:
+        stats.last_review = Review.objects.filter(
+            title_id=title_id
+        ).aggregate(last_review=Max('pub_date'))['last_review']
+    stats.save()
+
+
+def add_title_scores(title_id, scores, last_review):
+    """Учитывает в рейтинге и статистике произведения оценки нескольких
+    новых отзывов: одно обновление рейтинга и одна запись статистики
+    независимо от количества отзывов.
+    """
+    if not scores:
+        return
+    update_title_rating(title_id, sum(scores), len(scores))
+    stats, _ = TitleStats.objects.select_for_update().get_or_create(
+        title_id=title_id
+    )
+    for score in scores:
+        stats.add_score(score)
+    if stats.last_review is None or last_review > stats.last_review:
+        stats.last_review = last_review
+    stats.save()
+
+
+def rebuild_title_stats(titles=None):
+    """Пересчитывает статистику оценок произведений по отзывам одним
+    группирующим запросом и перезаписывает её. Возвращает количество
+    обработанных произведений.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    stats = {
+        pk: TitleStats(title_id=pk, histogram=empty_histogram())
+        for pk in titles.values_list('pk', flat=True)
+    }
+    rows = Review.objects.using(titles.db).filter(
+        title__in=titles.values('pk')
+    ).values('title_id', 'score').annotate(
+        number=Count('pk'), last_review=Max('pub_date')
+    ).order_by()
+    for row in rows.iterator():
+        title_stats = stats[row['title_id']]
+        title_stats.histogram[row['score'] - MIN_SCORE] = row['number']
+        if (title_stats.last_review is None
+                or row['last_review'] > title_stats.last_review):
+            title_stats.last_review = row['last_review']
+    with transaction.atomic(using=titles.db):
+        manager = TitleStats.objects.using(titles.db)
+        manager.filter(title__in=titles.values('pk')).delete()
+        manager.bulk_create(stats.values(), batch_size=500)
+    return len(stats)
@@ -0,0 +1,464 @@
+import csv
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import UniqueConstraint
+from django.utils import timezone
+
+from reviews.signals import bulk_loaded
+
+NULL_MARKER = r'\N'
+
+
+def read_rows(path):
+    """Построчно читает csv-файл, не загружая его в память целиком."""
+    with open(path, 'r', encoding='utf-8', newline='') as fdata:
+        reader = csv.DictReader(fdata)
+        for row in reader:
+            yield row
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class RowError(Exception):
+    pass
+
+
+class TableImporter:
+    """Потоковая загрузка csv-файла в таблицу модели.
+
+    Строки проверяются пачками без обращений к БД: внешние ключи
+    сверяются с картами идентификаторов, уникальность - с картами
+    значений, загруженными один раз перед началом. Корректные строки
+    записываются через COPY FROM STDIN (PostgreSQL) или пакетным
+    INSERT в одной транзакции на таблицу, отклонённые - в отдельный файл.
+    """
+
+    def __init__(self, model, fdata, overwrite=False, batch_size=5000,
+                 rejects_dir=None, using='default'):
+        self.model = model
+        self.fdata = fdata
+        self.overwrite = overwrite
+        self.batch_size = batch_size
+        self.rejects_dir = rejects_dir
+        self.using = using
+        self.connection = connections[using]
+        self.loaded = 0
+        self.rejected = 0
+        self.elapsed = 0
+        self.rejects_path = None
+        self._rejects_file = None
+        self._rejects_writer = None
+
+    @property
+    def rate(self):
+        return self.loaded / self.elapsed if self.elapsed else 0
+
+    def load(self):
+        started = time.monotonic()
+        rows = read_rows(self.fdata)
+        try:
+            with transaction.atomic(using=self.using):
+                self.prepare()
+                if self.connection.vendor == 'postgresql':
+                    self.load_with_copy(rows)
+                else:
+                    self.load_with_insert(rows)
+                self.reset_sequences()
+                bulk_loaded.send(sender=self.model, using=self.using)
+        finally:
+            if self._rejects_file is not None:
+                self._rejects_file.close()
+        self.elapsed = time.monotonic() - started
+        return self
+
+    def prepare(self):
+        """Строит карты идентификаторов и уникальных значений."""
+        meta = self.model._meta
+        self.fields = {}
+        for field in meta.concrete_fields:
+            self.fields[field.name] = field
+            self.fields[field.attname] = field
+        self.fk_maps = {}
+        for field in meta.concrete_fields:
+            if field.is_relation:
+                self.fk_maps[field.attname] = {
+                    str(pk): pk
+                    for pk in field.related_model._base_manager.using(
+                        self.using
+                    ).values_list('pk', flat=True).iterator()
+                }
+        manager = self.model._base_manager.using(self.using)
+        self.existing_pks = set(
+            manager.values_list('pk', flat=True).iterator()
+        )
+        self.seen_pks = set()
+        self.unique_maps = {}
+        for fields in self.unique_field_sets():
+            existing = {}
+            for values in manager.values_list(
+                'pk', *fields
+            ).iterator():
+                existing[values[1:]] = values[0]
+            self.unique_maps[fields] = existing
+
+    def unique_field_sets(self):
+        meta = self.model._meta
+        field_sets = [
+            (field.attname,) for field in meta.concrete_fields
+            if field.unique and not field.primary_key
+        ]
+        field_sets.extend(
+            tuple(meta.get_field(name).attname for name in fields)
+            for fields in meta.unique_together
+        )
+        field_sets.extend(
+            tuple(meta.get_field(name).attname for name in constraint.fields)
+            for constraint in meta.constraints
+            if isinstance(constraint, UniqueConstraint)
+            and constraint.condition is None
+        )
+        return field_sets
+
+    def clean_row(self, row):
+        """Преобразует строку csv в словарь {attname: значение}."""
+        values = {}
+        for column, raw in row.items():
+            field = self.fields.get(column)
+            if field is None:
+                continue
+            if raw == '' and field.null:
+                raw = None
+            if field.is_relation:
+                values[field.attname] = self.resolve_fk(field, raw)
+                continue
+            try:
+                values[field.attname] = self.clean_value(field, raw)
+            except ValidationError as error:
+                raise RowError(f'{column}: {"; ".join(error.messages)}')
+        self.check_unique(values)
+        self.fill_defaults(values)
+        return values
+
+    @staticmethod
+    def clean_value(field, raw):
+        """Проверяет значение так же строго, как его примет БД, плюс
+        валидаторы и choices поля; пустые значения не отклоняются.
+        """
+        if raw is None:
+            return None
+        value = field.to_python(raw)
+        if value in field.empty_values:
+            return value
+        if field.choices:
+            field.validate(value, None)
+        if field.validators:
+            field.run_validators(value)
+        return value
+
+    def fill_defaults(self, values):
+        """Заполняет отсутствующие в файле поля значениями по умолчанию
+        модели: в таблицу пишутся все столбцы, как при save().
+        """
+        for field in self.model._meta.concrete_fields:
+            if field.attname in values or field.primary_key:
+                continue
+            if (getattr(field, 'auto_now', False)
+                    or getattr(field, 'auto_now_add', False)):
+                values[field.attname] = timezone.now()
+            else:
+                values[field.attname] = field.get_default()
+
+    def resolve_fk(self, field, raw):
+        if raw is None:
+            return None
+        pk = self.fk_maps[field.attname].get(raw.strip())
+        if pk is None:
+            raise RowError(
+                f'{field.name}: объект с id={raw} не найден'
+            )
+        return pk
+
+    def check_unique(self, values):
+        pk = values.get(self.model._meta.pk.attname)
+        if pk is not None:
+            if pk in self.seen_pks:
+                raise RowError(f'id: повторяющееся значение {pk}')
+            if not self.overwrite and pk in self.existing_pks:
+                raise RowError(f'id: запись {pk} уже существует')
+        for fields, existing in self.unique_maps.items():
+            key = tuple(values.get(name) for name in fields)
+            if None in key:
+                continue
+            owner = existing.get(key)
+            if owner is not None and (pk is None or owner != pk):
+                raise RowError(
+                    f'{", ".join(fields)}: значение {key} уже существует'
+                )
+        if pk is not None:
+            self.seen_pks.add(pk)
+        for fields, existing in self.unique_maps.items():
+            key = tuple(values.get(name) for name in fields)
+            if None not in key:
+                existing[key] = pk if pk is not None else -1
+
+    def clean_batch(self, batch):
+        cleaned = []
+        for row in batch:
+            try:
+                cleaned.append(self.clean_row(row))
+            except RowError as error:
+                self.reject(row, error)
+        return cleaned
+
+    def reject(self, row, error):
+        self.rejected += 1
+        if self.rejects_dir is None:
+            return
+        if self._rejects_writer is None:
+            os.makedirs(self.rejects_dir, exist_ok=True)
+            self.rejects_path = os.path.join(
+                self.rejects_dir, f'{self.model._meta.model_name}.csv'
+            )
+            self._rejects_file = open(
+                self.rejects_path, 'w', encoding='utf-8', newline=''
+            )
+            self._rejects_writer = csv.DictWriter(
+                self._rejects_file,
+                fieldnames=[*row.keys(), 'error'],
+                extrasaction='ignore'
+            )
+            self._rejects_writer.writeheader()
+        self._rejects_writer.writerow({**row, 'error': str(error)})
+
+    def load_with_insert(self, rows):
+        """Пакетная вставка для СУБД без COPY. В отличие от bulk_create
+        сохраняет значения полей auto_now(_add), указанные в файле.
+        """
+        meta = self.model._meta
+        with self.connection.cursor() as cursor:
+            for batch in batches(rows, self.batch_size):
+                cleaned = self.clean_batch(batch)
+                if not cleaned:
+                    continue
+                fields = [
+                    field for field in meta.concrete_fields
+                    if field.attname in cleaned[0]
+                ]
+                cursor.executemany(
+                    self.insert_sql(fields),
+                    [
+                        [
+                            field.get_db_prep_save(
+                                values[field.attname], self.connection
+                            )
+                            for field in fields
+                        ]
+                        for values in cleaned
+                    ]
+                )
+                self.loaded += len(cleaned)
+
+    def insert_sql(self, fields):
+        quote = self.connection.ops.quote_name
+        columns = [field.attname for field in fields]
+        return (
+            f'INSERT INTO {quote(self.model._meta.db_table)} '
+            f'({", ".join(quote(name) for name in columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))}) '
+            f'{self.conflict_clause(columns)}'
+        )
+
+    def derived_columns(self):
+        """Столбцы, которые ведёт само приложение (editable=False, кроме
+        дат auto_now): рейтинг произведения, версия токенов пользователя.
+        """
+        return {
+            field.attname for field in self.model._meta.concrete_fields
+            if not field.editable
+            and not getattr(field, 'auto_now', False)
+            and not getattr(field, 'auto_now_add', False)
+        }
+
+    def conflict_clause(self, columns):
+        """При перезаписи строки с существующим id обновляются. Производные
+        столбцы остаются прежними: в файле их нет, и значения по умолчанию
+        затёрли бы, например, рейтинг произведения с отзывами.
+        """
+        quote = self.connection.ops.quote_name
+        pk = self.model._meta.pk.attname
+        if pk not in columns:
+            return ''
+        skipped = {pk} | self.derived_columns()
+        updates = ', '.join(
+            f'{quote(name)} = EXCLUDED.{quote(name)}'
+            for name in columns if name not in skipped
+        )
+        if self.overwrite and updates:
+            return f'ON CONFLICT ({quote(pk)}) DO UPDATE SET {updates}'
+        return f'ON CONFLICT ({quote(pk)}) DO NOTHING'
+
+    def load_with_copy(self, rows):
+        meta = self.model._meta
+        quote = self.connection.ops.quote_name
+        staging = quote(f'import_{meta.db_table}')
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging} '
+                f'(LIKE {quote(meta.db_table)} INCLUDING DEFAULTS) '
+                'ON COMMIT DROP'
+            )
+            columns = None
+            for batch in batches(rows, self.batch_size):
+                cleaned = self.clean_batch(batch)
+                if not cleaned:
+                    continue
+                columns = [
+                    field.attname for field in meta.concrete_fields
+                    if field.attname in cleaned[0]
+                ]
+                self.copy_batch(cursor, staging, columns, cleaned)
+            if columns:
+                self.loaded = self.insert_from_staging(
+                    cursor, staging, columns
+                )
+
+    def copy_batch(self, cursor, staging, columns, cleaned):
+        quote = self.connection.ops.quote_name
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for values in cleaned:
+            writer.writerow([
+                NULL_MARKER if values.get(name) is None
+                else self.to_copy_value(values[name])
+                for name in columns
+            ])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f'COPY {staging} ({", ".join(quote(c) for c in columns)}) '
+            f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')",
+            buffer
+        )
+
+    @staticmethod
+    def to_copy_value(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def insert_from_staging(self, cursor, staging, columns):
+        quote = self.connection.ops.quote_name
+        meta = self.model._meta
+        column_list = ', '.join(quote(name) for name in columns)
+        cursor.execute(
+            f'INSERT INTO {quote(meta.db_table)} ({column_list}) '
+            f'SELECT {column_list} FROM {staging} '
+            f'{self.conflict_clause(columns)}'
+        )
+        return cursor.rowcount
+
+    def reset_sequences(self):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        if not statements:
+            return
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def dependency_graph(models):
+    """Строит граф зависимостей таблиц по внешним ключам моделей.
+    models - словарь {имя таблицы: модель}; для каждой таблицы
+    возвращается множество имён таблиц, которые должны быть загружены
+    раньше неё. Ссылки на модели вне словаря не учитываются.
+    """
+    names = {model: name for name, model in models.items()}
+    graph = {}
+    for name, model in models.items():
+        graph[name] = {
+            names[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in names
+            and field.related_model is not model
+        }
+    return graph
+
+
+def dependency_order(graph):
+    """Порядок загрузки, в котором каждая таблица идёт после своих
+    зависимостей; при равенстве сохраняется порядок словаря.
+    """
+    pending = dict(graph)
+    order = []
+    while pending:
+        ready = [
+            name for name, deps in pending.items()
+            if deps <= set(order)
+        ]
+        if not ready:
+            raise ValueError(
+                f'циклическая зависимость таблиц: {", ".join(pending)}'
+            )
+        for name in ready:
+            order.append(name)
+            del pending[name]
+    return order
+
+
+def _run_with_own_connection(task, name):
+    # В каждом потоке Django открывает собственные соединения с БД,
+    # их нужно закрыть перед возвратом потока в пул.
+    try:
+        return task(name)
+    finally:
+        connections.close_all()
+
+
+def run_in_dependency_order(graph, task, jobs=1):
+    """Выполняет task(name) для каждой таблицы графа. Таблица
+    запускается, как только загружены все её зависимости; независимые
+    таблицы обрабатываются параллельно в jobs потоках, у каждого
+    потока своё соединение с БД.
+
+    Возвращает (результаты, ошибки, пропущенные): если загрузка
+    таблицы завершилась ошибкой, зависящие от неё таблицы пропускаются.
+    """
+    dependency_order(graph)
+    pending = {name: set(deps) for name, deps in graph.items()}
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        running = {}
+        while True:
+            for name in [n for n, deps in pending.items()
+                         if deps <= results.keys()]:
+                del pending[name]
+                future = executor.submit(
+                    _run_with_own_connection, task, name
+                )
+                running[future] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    errors[name] = future.exception()
+                else:
+                    results[name] = future.result()
+    return results, errors, list(pending)
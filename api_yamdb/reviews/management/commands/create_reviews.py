@@ -1,13 +1,17 @@
-import csv
-
 from api_yamdb.settings import BASE_DIR
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
+from reviews.importer import (
+    TableImporter, dependency_graph, dependency_order,
+    run_in_dependency_order
+)
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 from users.models import User
 
 
 DATA_IMPORT_DIR = f'{BASE_DIR}/static/data'
+REJECTS_DIR = f'{DATA_IMPORT_DIR}/rejected'
 
 
 class Command(BaseCommand):
@@ -18,6 +22,13 @@ class Command(BaseCommand):
     manage.py create_review --overwrite - полностью перезаписывает данные в БД.
     python manage.py create_reviews --overwrite --table name_table
     - перезаписывает данные в таблице name_table.
+    python manage.py create_reviews --batch-size 10000 - размер пачки
+    строк, которые проверяются и записываются за один раз.
+    python manage.py create_reviews --rejects dir - каталог для файлов
+    с отклонёнными строками (по одному csv на таблицу).
+    python manage.py create_reviews --jobs 4 - загружает независимые
+    таблицы параллельно в 4 потоках; порядок определяется внешними
+    ключами моделей.
     """
     help = (
         'используйте: manage.py create_review'
@@ -64,24 +75,70 @@ class Command(BaseCommand):
             '-t', '--table',
             type=str, help='имя таблица для заполнения тестовыми данными'
         )
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int, default=5000,
+            help='количество строк в одной пачке'
+        )
+        parser.add_argument(
+            '-r', '--rejects',
+            type=str, default=REJECTS_DIR,
+            help='каталог для файлов с отклонёнными строками'
+        )
+        parser.add_argument(
+            '-j', '--jobs',
+            type=int, default=1,
+            help='количество таблиц, загружаемых одновременно'
+        )
 
     def loading_data(self, fdata, model):
-        with open(fdata, 'r') as fdata:
-            data = csv.reader(fdata)
-            fields = next(data)
-            for row in data:
-                record = dict(zip(fields, row))
-                try:
-                    m = model(**record)
-                    m.save()
-                except Exception as ex:
-                    print(
-                        f'запись из файла {fdata.name}:'
-                        f' {record} содержит ошибки и не была занесена в БД.'
-                        f' Возникло исключение {ex}.'
-                    )
+        importer = TableImporter(
+            model,
+            fdata,
+            overwrite=self.options.get('overwrite'),
+            batch_size=self.options.get('batch_size'),
+            rejects_dir=self.options.get('rejects'),
+        ).load()
+        self.stdout.write(
+            f'{model._meta.model_name}: записано {importer.loaded} строк'
+            f' за {importer.elapsed:.1f} с ({importer.rate:.0f} строк/с).'
+        )
+        if importer.rejected:
+            self.stderr.write(
+                f'{model._meta.model_name}: отклонено {importer.rejected}'
+                f' строк, см. {importer.rejects_path}.'
+            )
+
+    def load_tables(self):
+        """Загружает все таблицы с учётом зависимостей между ними."""
+        tables = self.PARAMETERS_LOADING_LIST
+        graph = dependency_graph(
+            {name: params['model'] for name, params in tables.items()}
+        )
+        jobs = self.options.get('jobs') or 1
+        if jobs > 1 and connection.vendor == 'sqlite':
+            self.stderr.write(
+                'SQLite не поддерживает параллельную запись,'
+                ' таблицы загружаются последовательно.'
+            )
+            jobs = 1
+        if jobs == 1:
+            for table_name in dependency_order(graph):
+                self.loading_data(**tables[table_name])
+            return
+        _, errors, skipped = run_in_dependency_order(
+            graph, lambda name: self.loading_data(**tables[name]), jobs
+        )
+        for table_name, error in errors.items():
+            self.stderr.write(f'{table_name}: {error}')
+        if errors or skipped:
+            raise CommandError(
+                'Загрузка прервана, не загружены таблицы: '
+                f'{", ".join([*errors, *skipped])}.'
+            )
 
     def handle(self, *args, **options):
+        self.options = options
         overwrite = options.get('overwrite')
         table = options.get('table')
 
@@ -93,9 +150,7 @@ class Command(BaseCommand):
 
         # --overwrite
         if overwrite and not table:
-            for table_name in self.PARAMETERS_LOADING_LIST:
-                param_load = self.PARAMETERS_LOADING_LIST[table_name]
-                self.loading_data(**param_load)
+            self.load_tables()
             return 'Данные в БД перезаписаны.'
 
         # --table
@@ -110,7 +165,7 @@ class Command(BaseCommand):
                     f' {table}'
                 )
             self.loading_data(**param_load)
-            return 'Данные в таблицу {table} записаны.'
+            return f'Данные в таблицу {table} записаны.'
 
         for table_name in self.PARAMETERS_LOADING_LIST:
             param_load = self.PARAMETERS_LOADING_LIST[table_name]
@@ -121,8 +176,5 @@ class Command(BaseCommand):
                     'python manage.py create_reviews --overwrite'
                 )
 
-        for table_name in self.PARAMETERS_LOADING_LIST:
-            param_load = self.PARAMETERS_LOADING_LIST[table_name]
-            self.loading_data(**param_load)
-
+        self.load_tables()
         return 'Загрузка данных в БД завершена.'
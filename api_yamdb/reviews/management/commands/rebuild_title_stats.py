@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from reviews.aggregates import rebuild_title_stats
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Команда manage.py rebuild_title_stats - пересчитывает статистику
+    оценок произведений по отзывам с нуля.
+    python manage.py rebuild_title_stats --batch-size 1000 - количество
+    произведений, пересчитываемых в одной транзакции.
+    """
+    help = (
+        'используйте: manage.py rebuild_title_stats'
+        ' для пересчёта статистики оценок произведений'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int, default=1000,
+            help='количество произведений в одной пачке'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size')
+        pks = list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        rebuilt = 0
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start:start + batch_size]
+            rebuilt += rebuild_title_stats(
+                Title.objects.filter(pk__range=(batch[0], batch[-1]))
+            )
+        return f'Пересчитана статистика произведений: {rebuilt}.'
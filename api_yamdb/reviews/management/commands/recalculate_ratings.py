@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.aggregates import recalculate_ratings
+
+
+class Command(BaseCommand):
+    """Команда manage.py recalculate_ratings - пересчитывает рейтинг
+    произведений по отзывам с нуля и исправляет расхождения.
+    python manage.py recalculate_ratings --check - только проверяет
+    рейтинг на расхождения, не изменяя данные, и завершается с ошибкой,
+    если они найдены.
+    """
+    help = (
+        'используйте: manage.py recalculate_ratings'
+        ' для пересчёта рейтинга произведений'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-c', '--check',
+            action='store_true',
+            help='только проверить рейтинг на расхождения'
+        )
+
+    def handle(self, *args, **options):
+        check = options.get('check')
+        with transaction.atomic():
+            drift = recalculate_ratings(fix=not check)
+        for title, stored, actual in drift:
+            self.stdout.write(
+                f'{title.pk} {title}: сохранено (сумма, количество,'
+                f' рейтинг) {stored}, фактически {actual}.'
+            )
+        if not drift:
+            return 'Расхождений в рейтинге не найдено.'
+        if check:
+            raise CommandError(
+                f'Найдено расхождений в рейтинге: {len(drift)}.'
+            )
+        return f'Исправлено расхождений в рейтинге: {len(drift)}.'
@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-18 06:27
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+import reviews.models
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {}
+    rows = Review.objects.values('title_id', 'score').annotate(
+        number=Count('pk'), last_review=Max('pub_date')
+    ).order_by()
+    for row in rows.iterator():
+        title_stats = stats.setdefault(row['title_id'], TitleStats(
+            title_id=row['title_id'],
+            histogram=reviews.models.empty_histogram()
+        ))
+        title_stats.histogram[row['score'] - 1] = row['number']
+        if (title_stats.last_review is None
+                or row['last_review'] > title_stats.last_review):
+            title_stats.last_review = row['last_review']
+    TitleStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('histogram', models.JSONField(default=reviews.models.empty_histogram, verbose_name='Распределение оценок')),
+                ('last_review', models.DateTimeField(null=True, verbose_name='Дата последнего отзыва')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,96 @@
+from django.db import migrations
+
+# Поля, по которым строится поисковый индекс, с весами для PostgreSQL.
+SEARCH_TABLES = {
+    'reviews_title': (('name', 'A'), ('description', 'B')),
+    'reviews_review': (('text', 'A'),),
+    'reviews_comment': (('text', 'A'),),
+}
+SEARCH_CONFIG = 'russian'
+
+
+def postgresql_forward(schema_editor, table, fields):
+    vector = ' || '.join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+        f"coalesce({column}, '')), '{weight}')"
+        for column, weight in fields
+    )
+    schema_editor.execute(
+        f'ALTER TABLE {table} ADD COLUMN search_vector tsvector '
+        f'GENERATED ALWAYS AS ({vector}) STORED'
+    )
+    schema_editor.execute(
+        f'CREATE INDEX {table}_search_idx ON {table} '
+        'USING GIN (search_vector)'
+    )
+
+
+def sqlite_forward(schema_editor, table, fields):
+    # Таблица FTS5 с внешним содержимым синхронизируется триггерами.
+    # Триггеры удаляются, если SQLite пересоздаёт таблицу при изменении
+    # её полей: такая миграция должна создать их заново.
+    columns = ', '.join(column for column, _ in fields)
+    new_values = ', '.join(f'new.{column}' for column, _ in fields)
+    old_values = ', '.join(f'old.{column}' for column, _ in fields)
+    fts = f'{table}_fts'
+    delete = (
+        f'INSERT INTO {fts}({fts}, rowid, {columns}) '
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert = (
+        f'INSERT INTO {fts}(rowid, {columns}) '
+        f'VALUES (new.id, {new_values});'
+    )
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {fts} USING fts5({columns}, '
+        f"content='{table}', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END'
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END'
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} '
+        f'BEGIN {delete} {insert} END'
+    )
+    schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, fields in SEARCH_TABLES.items():
+        if vendor == 'postgresql':
+            postgresql_forward(schema_editor, table, fields)
+        elif vendor == 'sqlite':
+            sqlite_forward(schema_editor, table, fields)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in SEARCH_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'ALTER TABLE {table} DROP COLUMN search_vector'
+            )
+        elif vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(
+                    f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}'
+                )
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_titlestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
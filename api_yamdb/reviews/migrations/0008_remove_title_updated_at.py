@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 07:26
+
+from importlib import import_module
+
+from django.db import migrations
+
+search_index = import_module('reviews.migrations.0006_search_index')
+TITLE_TABLE = 'reviews_title'
+
+
+def rebuild_title_search_index(apps, schema_editor):
+    # SQLite пересоздаёт таблицу при удалении поля, и триггеры
+    # полнотекстового индекса удаляются вместе с ней.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(
+            f'DROP TRIGGER IF EXISTS {TITLE_TABLE}_fts_{suffix}'
+        )
+    schema_editor.execute(f'DROP TABLE IF EXISTS {TITLE_TABLE}_fts')
+    search_index.sqlite_forward(
+        schema_editor, TITLE_TABLE, search_index.SEARCH_TABLES[TITLE_TABLE]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, rebuild_title_search_index
+        ),
+        migrations.RemoveField(
+            model_name='title',
+            name='updated_at',
+        ),
+        migrations.RunPython(
+            rebuild_title_search_index, migrations.RunPython.noop
+        ),
+    ]
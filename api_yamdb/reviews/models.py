@@ -1,11 +1,14 @@
 
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.db.models import UniqueConstraint
 
 from reviews.validators import validate_year
 from users.models import User
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+
 
 class Category(models.Model):
     """Модель Категории."""
@@ -88,11 +91,32 @@ class Title(models.Model):
         blank=True,
         null=True
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг произведения',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -106,6 +130,12 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = 'Жанр и произведение'
         verbose_name_plural = 'Жанры и произведения'
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='genretitle_genre_title_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Жанр: {self.genre}, произведение: {self.title}'
@@ -128,7 +158,9 @@ class Review(models.Model):
         verbose_name='Автор отзыва'
     )
     score = models.IntegerField(
-        validators=[MinValueValidator(1), MaxValueValidator(10)]
+        validators=[
+            MinValueValidator(MIN_SCORE), MaxValueValidator(MAX_SCORE)
+        ]
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
@@ -143,10 +175,103 @@ class Review(models.Model):
         constraints = [
             UniqueConstraint(fields=['title', 'author'], name='unique_review')
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating_state()
+        return instance
+
+    def remember_rating_state(self):
+        """Запоминает произведение и оценку, учтённые в рейтинге."""
+        self._rating_state = (
+            self.__dict__.get('title_id'), self.__dict__.get('score')
+        )
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется обработчиком post_save
+        # в той же транзакции, что и сам отзыв.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+def empty_histogram():
+    return [0] * (MAX_SCORE - MIN_SCORE + 1)
+
+
+class TitleStats(models.Model):
+    """Статистика оценок произведения. histogram[i] - количество отзывов
+    с оценкой MIN_SCORE + i: среднее, медиана и количество отзывов
+    считаются по нему без обращения к отзывам.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение'
+    )
+    histogram = models.JSONField(
+        default=empty_histogram,
+        verbose_name='Распределение оценок'
+    )
+    last_review = models.DateTimeField(
+        null=True,
+        verbose_name='Дата последнего отзыва'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    def __str__(self):
+        return f'Статистика: {self.title_id}'
+
+    @property
+    def count(self):
+        return sum(self.histogram)
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            (MIN_SCORE + index) * number
+            for index, number in enumerate(self.histogram)
+        ) / count
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle = (count - 1) // 2
+        if count % 2:
+            return self.nth_score(middle)
+        return (self.nth_score(middle) + self.nth_score(middle + 1)) / 2
+
+    def nth_score(self, position):
+        """Оценка на позиции position в отсортированном ряду оценок."""
+        for index, number in enumerate(self.histogram):
+            if position < number:
+                return MIN_SCORE + index
+            position -= number
+        raise IndexError(position)
+
+    def add_score(self, score, delta=1):
+        self.histogram[score - MIN_SCORE] += delta
+
 
 class Comment(models.Model):
     """Модель комментарии к отзывам."""
@@ -173,6 +298,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -0,0 +1,102 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Конфигурация полнотекстового поиска PostgreSQL. Должна совпадать
+# с конфигурацией столбцов search_vector в миграции 0006_search_index.
+SEARCH_CONFIG = 'russian'
+
+# Поля моделей, по которым построен поисковый индекс, и их веса
+# в PostgreSQL - как в миграции 0006_search_index.
+SEARCH_FIELDS = {
+    'reviews.title': (('name', 'A'), ('description', 'B')),
+    'reviews.review': (('text', 'A'),),
+    'reviews.comment': (('text', 'A'),),
+}
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def indexed_fields(model, fields=None):
+    """Поля индекса модели с весами; fields ограничивает поиск частью
+    полей индекса.
+    """
+    indexed = SEARCH_FIELDS[model._meta.label_lower]
+    if fields is None:
+        return indexed
+    return tuple((name, weight) for name, weight in indexed if name in fields)
+
+
+def full_text_search(queryset, query, fields=None):
+    """Отбирает объекты queryset, подходящие под поисковый запрос, и
+    сортирует их по релевантности (аннотация search_rank). fields -
+    поля индекса, по которым ищется запрос; по умолчанию все.
+
+    PostgreSQL ищет по хранимому столбцу tsvector с GIN-индексом,
+    SQLite - по таблице FTS5; обе поддерживаются в актуальном
+    состоянии самой СУБД. Для остальных СУБД выполняется поиск
+    подстроки без ранжирования.
+    """
+    model = queryset.model
+    searched = indexed_fields(model, fields)
+    if not search_terms(query) or not searched:
+        return queryset.none()
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        rank, match = postgresql_search(connection, model, query, searched)
+    elif connection.vendor == 'sqlite':
+        rank, match = sqlite_search(connection, model, query, searched)
+    else:
+        rank = Value(0.0, output_field=FloatField())
+        match = Q()
+        for field, _ in searched:
+            match |= Q(**{f'{field}__icontains': query})
+    return queryset.annotate(search_rank=rank).filter(match).order_by(
+        '-search_rank', 'pk'
+    )
+
+
+def postgresql_search(connection, model, query, searched):
+    quote = connection.ops.quote_name
+    column = f'{quote(model._meta.db_table)}.search_vector'
+    tsquery = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+    if len(searched) < len(indexed_fields(model)):
+        # Часть полей: слова запроса помечаются весами этих полей.
+        weights = ''.join(weight for _, weight in searched)
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        query = ' & '.join(
+            f'{term}:{weights}' for term in search_terms(query)
+        )
+    rank = RawSQL(
+        f'ts_rank({column}, {tsquery})', [query],
+        output_field=FloatField()
+    )
+    match = RawSQL(
+        f'{column} @@ {tsquery}', [query], output_field=BooleanField()
+    )
+    return rank, match
+
+
+def sqlite_search(connection, model, query, searched):
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    fts = quote(f'{table}_fts')
+    # Каждое слово запроса ищется как префикс, кавычки отключают
+    # синтаксис запросов FTS5 во вводе пользователя.
+    match_query = ' '.join(f'"{term}"*' for term in search_terms(query))
+    if len(searched) < len(indexed_fields(model)):
+        columns = ' '.join(name for name, _ in searched)
+        match_query = f'{{{columns}}} : ({match_query})'
+    rank = RawSQL(
+        f'SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s'
+        f' AND {fts}.rowid = {quote(table)}.{quote(model._meta.pk.column)}',
+        [match_query], output_field=FloatField()
+    )
+    match = Q(pk__in=RawSQL(
+        f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match_query]
+    ))
+    return rank, match
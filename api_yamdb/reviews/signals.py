@@ -0,0 +1,75 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from reviews.aggregates import (
+    rebuild_title_stats, recalculate_ratings, update_title_rating,
+    update_title_stats
+)
+from reviews.models import Review, Title
+
+# Отправляется после массовой загрузки строк модели в обход save()
+# (bulk_create, COPY): аргументы sender - модель, using - псевдоним БД.
+bulk_loaded = Signal()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новый или изменённый отзыв в рейтинге и статистике
+    оценок произведения.
+    """
+    if raw:
+        return
+    old_title_id, old_score = getattr(
+        instance, '_rating_state', (None, None)
+    )
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_title_stats(
+            instance.title_id, instance.score, pub_date=instance.pub_date
+        )
+    elif old_title_id is None or old_score is None:
+        # Отзыв сохранён без загрузки из БД: прежняя оценка неизвестна.
+        titles = Title.objects.filter(pk=instance.title_id)
+        recalculate_ratings(titles)
+        rebuild_title_stats(titles)
+    elif old_title_id != instance.title_id:
+        update_title_rating(old_title_id, -old_score, -1)
+        update_title_rating(instance.title_id, instance.score, 1)
+        update_title_stats(
+            old_title_id, old_score=old_score, old_pub_date=instance.pub_date
+        )
+        update_title_stats(
+            instance.title_id, instance.score, pub_date=instance.pub_date
+        )
+    else:
+        update_title_rating(
+            instance.title_id, instance.score - old_score, 0
+        )
+        update_title_stats(
+            instance.title_id, instance.score, old_score=old_score
+        )
+    instance.remember_rating_state()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Исключает удалённый отзыв из рейтинга и статистики произведения."""
+    title_id, score = getattr(
+        instance, '_rating_state', (instance.title_id, instance.score)
+    )
+    if title_id is None or score is None:
+        title_id, score = instance.title_id, instance.score
+    update_title_rating(title_id, -score, -1)
+    update_title_stats(
+        title_id, old_score=score, old_pub_date=instance.pub_date
+    )
+
+
+@receiver(bulk_loaded, sender=Review)
+def reviews_bulk_loaded(sender, using, **kwargs):
+    """Пересчитывает рейтинг и статистику после массовой загрузки
+    отзывов.
+    """
+    titles = Title.objects.using(using)
+    recalculate_ratings(titles)
+    rebuild_title_stats(titles)
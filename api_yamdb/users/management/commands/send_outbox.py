@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from users.outbox import purge_sent, send_pending
+
+
+class Command(BaseCommand):
+    """Команда manage.py send_outbox - отправляет письма из очереди.
+    Работает постоянно: пачки писем отправляются через одно SMTP-соединение,
+    которое закрывается, когда очередь пуста.
+    python manage.py send_outbox --once - отправляет накопившиеся письма
+    и завершается.
+    python manage.py send_outbox --batch-size 200 - количество писем,
+    забираемых из очереди за раз.
+    Когда очередь пуста, отправленные письма старше OUTBOX_RETENTION
+    удаляются.
+    """
+    help = (
+        'используйте: manage.py send_outbox'
+        ' для отправки писем из очереди'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='отправить накопившиеся письма и завершиться'
+        )
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help='количество писем в одной пачке'
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(fail_silently=False)
+        total = 0
+        try:
+            while True:
+                processed = send_pending(
+                    connection, batch_size=options['batch_size']
+                )
+                total += processed
+                if processed:
+                    continue
+                connection.close()
+                purge_sent()
+                if options['once']:
+                    break
+                time.sleep(settings.OUTBOX_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        return f'Обработано писем: {total}.'
@@ -0,0 +1,37 @@
+# Generated by Django 3.2 on 2026-10-18 07:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема:')),
+                ('body', models.TextField(verbose_name='Текст:')),
+                ('from_email', models.EmailField(max_length=254, verbose_name='Отправитель:')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Получатель:')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано:')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Отправить после:')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки:')),
+                ('last_error', models.TextField(blank=True, verbose_name='Ошибка:')),
+                ('sent_at', models.DateTimeField(null=True, verbose_name='Отправлено:')),
+            ],
+            options={
+                'verbose_name': 'Письмо в очереди',
+                'verbose_name_plural': 'Очередь писем',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='emailoutbox',
+            index=models.Index(condition=models.Q(sent_at__isnull=True), fields=['send_after'], name='outbox_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Увеличивается при смене роли или блокировке: выпущенные ранее токены перестают действовать.', verbose_name='Версия токенов:'),
+        ),
+    ]
@@ -1,17 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-
-
-CHOICES_ROLE = (
-    ('user', 'Пользователь'),
-    ('admin', 'Администратор'),
-    ('moderator', 'Модератор')
-)
+from django.utils import timezone
 
 
 class User(AbstractUser):
     """Модель Пользователя."""
 
+    class ChoicesRole(models.TextChoices):
+        USER_ROLE = 'user', 'Пользователь'
+        ADMIN_ROLE = 'admin', 'Администратор'
+        MODERATOR_ROLE = 'moderator', 'Модератор'
+
     email = models.EmailField(
         max_length=254, unique=True,
         verbose_name="Email:",
@@ -24,15 +23,89 @@ class User(AbstractUser):
     )
     role = models.CharField(
         max_length=16,
-        choices=CHOICES_ROLE,
-        default='user',
+        choices=ChoicesRole.choices,
+        default=ChoicesRole.USER_ROLE,
         verbose_name="Роль:",
         help_text="Выберите роль: пользователь, модератор или администратор."
     )
 
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Версия токенов:",
+        help_text="Увеличивается при смене роли или блокировке: "
+                  "выпущенные ранее токены перестают действовать."
+    )
+
+    # Поля, которые записываются в токен доступа.
+    TOKEN_FIELDS = ('role', 'is_superuser', 'is_active')
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователь'
 
     def __str__(self):
         return f'username: {self.username}, email: {self.email}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_token_state()
+        return instance
+
+    def remember_token_state(self):
+        """Запоминает значения полей, записанных в токены."""
+        self._token_state = tuple(
+            self.__dict__.get(name) for name in self.TOKEN_FIELDS
+        )
+
+    def save(self, *args, **kwargs):
+        state = getattr(self, '_token_state', None)
+        if state is not None and state != tuple(
+            getattr(self, name) for name in self.TOKEN_FIELDS
+        ):
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self.remember_token_state()
+
+
+class EmailOutbox(models.Model):
+    """Письмо в очереди на отправку. Записывается в транзакции запроса,
+    отправляется отдельным процессом (manage.py send_outbox).
+    """
+
+    subject = models.CharField(max_length=255, verbose_name="Тема:")
+    body = models.TextField(verbose_name="Текст:")
+    from_email = models.EmailField(verbose_name="Отправитель:")
+    to_email = models.EmailField(verbose_name="Получатель:")
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Создано:"
+    )
+    send_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Отправить после:"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток отправки:"
+    )
+    last_error = models.TextField(blank=True, verbose_name="Ошибка:")
+    sent_at = models.DateTimeField(null=True, verbose_name="Отправлено:")
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=['send_after'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.to_email}: {self.subject}'
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import EmailOutbox
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь вместо отправки. Вызывается в транзакции
+    запроса: если она откатится, письмо не будет отправлено.
+    """
+    return EmailOutbox.objects.bulk_create(
+        EmailOutbox(
+            subject=subject,
+            body=message,
+            from_email=from_email,
+            to_email=recipient,
+        )
+        for recipient in recipient_list
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** attempts)
+
+
+def claim_pending(batch_size, max_attempts):
+    """Забирает пачку писем: строки блокируются с SKIP LOCKED только на
+    время короткой транзакции, в которой их send_after переносится на
+    OUTBOX_CLAIM_TIMEOUT секунд вперёд. Другие процессы эти письма не
+    берут; если процесс упал, не отправив их, письма снова попадут
+    в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                send_after__lte=now,
+                attempts__lt=max_attempts,
+            ).order_by('send_after')[:batch_size]
+        )
+        EmailOutbox.objects.filter(
+            pk__in=[message.pk for message in messages]
+        ).update(
+            send_after=now + timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT)
+        )
+    return messages
+
+
+def send_pending(connection, batch_size=None, max_attempts=None):
+    """Отправляет пачку писем из очереди через открытое соединение
+    connection и возвращает количество обработанных писем.
+
+    Письма отправляются вне транзакции: медленный SMTP-сервер не держит
+    блокировки строк. Письмо, отправка которого завершилась ошибкой,
+    откладывается с экспоненциально растущей задержкой; после
+    max_attempts попыток оно больше не отправляется.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+    messages = claim_pending(batch_size, max_attempts)
+    for message in messages:
+        send_message(connection, message)
+    EmailOutbox.objects.bulk_update(
+        messages, ['attempts', 'last_error', 'send_after', 'sent_at']
+    )
+    return len(messages)
+
+
+def purge_sent(retention=None):
+    """Удаляет отправленные письма старше OUTBOX_RETENTION секунд и
+    возвращает их количество.
+    """
+    retention = settings.OUTBOX_RETENTION if retention is None else retention
+    deleted, _ = EmailOutbox.objects.filter(
+        sent_at__lt=timezone.now() - timedelta(seconds=retention)
+    ).delete()
+    return deleted
+
+
+def send_message(connection, message):
+    message.attempts += 1
+    email = EmailMessage(
+        message.subject,
+        message.body,
+        message.from_email,
+        [message.to_email],
+        connection=connection,
+    )
+    try:
+        # Открытое заранее соединение не закрывается после письма и
+        # используется для всей пачки.
+        connection.open()
+        email.send()
+    except Exception as error:
+        message.last_error = f'{type(error).__name__}: {error}'
+        message.send_after = timezone.now() + retry_delay(message.attempts)
+        # Соединение могло быть разорвано сервером: следующее письмо
+        # откроет его заново.
+        try:
+            connection.close()
+        except Exception:
+            pass
+        return
+    message.sent_at = timezone.now()
+    message.last_error = ''
+
+
+def outbox_depth():
+    """Размер очереди писем: ожидают отправки, исчерпали попытки и
+    возраст самого старого неотправленного письма в секундах.
+    """
+    unsent = EmailOutbox.objects.filter(sent_at__isnull=True)
+    pending = unsent.filter(attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+    oldest = pending.order_by('created_at').values_list(
+        'created_at', flat=True
+    ).first()
+    return {
+        'pending': pending.count(),
+        'failed': unsent.filter(
+            attempts__gte=settings.OUTBOX_MAX_ATTEMPTS
+        ).count(),
+        'oldest_age': (
+            (timezone.now() - oldest).total_seconds() if oldest else 0
+        ),
+    }
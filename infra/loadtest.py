@@ -0,0 +1,109 @@
+"""Нагрузочный тест эндпоинтов чтения API.
+
+Запускает заданное число одновременных клиентов, которые в течение
+duration секунд по кругу запрашивают адреса из списка, и печатает
+количество запросов в секунду, перцентили задержки и число ошибок.
+
+Пример сравнения режимов при одинаковой памяти контейнера:
+    SERVER_MODE=wsgi docker-compose up -d web
+    python infra/loadtest.py http://localhost --clients 64 --duration 30
+    SERVER_MODE=asgi docker-compose up -d web
+    python infra/loadtest.py http://localhost --clients 64 --duration 30
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+PATHS = (
+    '/api/v1/titles/?limit=10',
+    '/api/v1/titles/1/',
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/1/reviews/',
+    '/api/v1/titles/1/reviews/1/comments/',
+)
+
+
+def client(base_url, paths, deadline, delay):
+    latencies, errors = [], 0
+    index = 0
+    while time.monotonic() < deadline:
+        url = base_url + paths[index % len(paths)]
+        index += 1
+        started = time.monotonic()
+        try:
+            with urlopen(url, timeout=30) as response:
+                # Медленный клиент: ответ читается с задержкой.
+                if delay:
+                    time.sleep(delay)
+                response.read()
+        except (HTTPError, URLError, OSError):
+            errors += 1
+            continue
+        latencies.append(time.monotonic() - started)
+    return latencies, errors
+
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('base_url')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument(
+        '--slow', type=float, default=0,
+        help='задержка чтения ответа клиентом, с'
+    )
+    parser.add_argument(
+        '--path', action='append', dest='paths',
+        help='адрес относительно base_url, можно указать несколько раз'
+    )
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    deadline = time.monotonic() + args.duration
+    barrier = threading.Barrier(args.clients)
+
+    def run():
+        barrier.wait()
+        return client(
+            args.base_url.rstrip('/'), args.paths or PATHS, deadline,
+            args.slow
+        )
+
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        results = list(executor.map(
+            lambda _: run(), range(args.clients)
+        ))
+    latencies = sorted(
+        latency for values, _ in results for latency in values
+    )
+    errors = sum(errors for _, errors in results)
+    if not latencies:
+        raise SystemExit(f'Нет успешных ответов, ошибок: {errors}.')
+    report = {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / args.duration,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+    if args.json:
+        print(json.dumps(report))
+        return
+    for key, value in report.items():
+        print(f'{key:>8}: {value:.1f}' if isinstance(value, float)
+              else f'{key:>8}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,88 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    from rest_framework.test import APIClient
+
+    return APIClient()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='admin', email='admin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def catalogue(django_user_model):
+    """Каталог с несколькими страницами произведений, отзывов и
+    комментариев от разных авторов.
+    """
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(4)
+    ]
+    users = [
+        django_user_model.objects.create(
+            username=f'user{i}', email=f'user{i}@yamdb.fake'
+        )
+        for i in range(12)
+    ]
+    titles = []
+    for i in range(12):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i,
+            category=categories[i % len(categories)],
+            description='Описание',
+        )
+        title.genre.set([genres[i % len(genres)], genres[-1]])
+        titles.append(title)
+    title = titles[0]
+    reviews = [
+        Review.objects.create(
+            title=title, author=user, text=f'Отзыв {i}', score=i % 10 + 1
+        )
+        for i, user in enumerate(users)
+    ]
+    review = reviews[0]
+    Comment.objects.bulk_create(
+        Comment(review=review, author=user, text=f'Комментарий {i}')
+        for i, user in enumerate(users)
+    )
+    return {'title': title, 'review': review, 'titles': titles}
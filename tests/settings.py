@@ -0,0 +1,15 @@
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+
+# Тесты с БД запускаются на SQLite в памяти, если СУБД не задана явно
+# через DB_ENGINE (например, в контейнере с postgres).
+if not os.getenv('DB_ENGINE'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
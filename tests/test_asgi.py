@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import path
+
+SLOW_VIEW_DELAY = 0.5
+
+
+def slow_view(request):
+    time.sleep(SLOW_VIEW_DELAY)
+    return HttpResponse('ok')
+
+
+def slow_urlpatterns():
+    from api.v1.asynchronous import as_async_view
+
+    return [path('slow/', as_async_view(slow_view))]
+
+
+# Маршруты для override_settings(ROOT_URLCONF='tests.test_asgi').
+urlpatterns = slow_urlpatterns()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_catalogue_views_run_in_thread_pool():
+    from api.v1.asynchronous import asynchronous_urls
+    from api.v1.urls import router_v1
+    from reviews.models import Category
+
+    Category.objects.create(name='Фильмы', slug='movie')
+    patterns = {
+        pattern.name: pattern
+        for pattern in asynchronous_urls(router_v1.urls, ('categories',))
+        if getattr(pattern, 'name', None)
+    }
+    view = patterns['categories-list'].callback
+    assert asyncio.iscoroutinefunction(view)
+    assert not asyncio.iscoroutinefunction(patterns['user-list'].callback)
+
+    response = async_to_sync(view)(RequestFactory().get('/'))
+    assert response.status_code == 200
+    assert response.data['results'] == [{'name': 'Фильмы', 'slug': 'movie'}]
+
+
+async def asgi_get(application, path):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path':
+        path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 1234),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(
+    ROOT_URLCONF='tests.test_asgi', TIMING_SAMPLE_RATE=1.0,
+    ALLOWED_HOSTS=['localhost']
+)
+def test_middleware_keeps_requests_concurrent():
+    from django.core.handlers.asgi import ASGIHandler
+
+    from api.middleware import TimingMiddleware
+
+    assert TimingMiddleware.async_capable
+    application = ASGIHandler()
+    requests = 4
+
+    async def run():
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(
+            asgi_get(application, '/slow/') for _ in range(requests)
+        ))
+        return statuses, time.perf_counter() - started
+
+    statuses, elapsed = async_to_sync(run)()
+    assert statuses == [200] * requests
+    assert elapsed < SLOW_VIEW_DELAY * 2, (
+        'Проверьте, что middleware не выполняет параллельные запросы'
+        f' ASGI по очереди: {requests} запроса заняли {elapsed:.2f} с'
+    )
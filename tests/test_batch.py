@@ -0,0 +1,122 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+
+from reviews.aggregates import rebuild_title_stats, recalculate_ratings
+from reviews.models import Comment, Review, Title, TitleStats
+
+
+def review_items(titles, users):
+    return [
+        {'title': title.pk, 'author': user.username,
+         'text': f'Отзыв {i}', 'score': i % 10 + 1}
+        for i, (title, user) in enumerate(
+            (title, user) for title in titles for user in users
+        )
+    ]
+
+
+@pytest.mark.django_db
+class TestBatch:
+
+    def test_reviews_batch_results(self, catalogue, admin_client,
+                                   django_user_model):
+        title, other = catalogue['title'], catalogue['titles'][1]
+        author = title.reviews.first().author
+        response = admin_client.post(reverse('api:batch-reviews-list'), [
+            {'title': other.pk, 'text': 'Новый', 'score': 5},
+            {'title': title.pk, 'author': author.username,
+             'text': 'Повтор', 'score': 5},
+            {'title': other.pk, 'text': 'Второй в пакете', 'score': 6},
+            {'title': 0, 'text': 'Нет произведения', 'score': 5},
+            {'title': other.pk, 'author': 'nobody', 'text': 'Нет автора',
+             'score': 5},
+            {'title': other.pk, 'text': 'Оценка', 'score': 11},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 400, 400, 400, 400, 400
+        ]
+        assert Review.objects.get(pk=results[0]['id']).text == 'Новый'
+        assert 'non_field_errors' in results[1]['errors']
+        assert 'non_field_errors' in results[2]['errors']
+        assert 'title' in results[3]['errors']
+        assert 'author' in results[4]['errors']
+        assert 'score' in results[5]['errors']
+
+    def test_reviews_batch_updates_aggregates(
+        self, catalogue, admin_client, django_user_model
+    ):
+        users = [
+            django_user_model.objects.create(
+                username=f'batch{i}', email=f'batch{i}@yamdb.fake'
+            )
+            for i in range(5)
+        ]
+        titles = catalogue['titles'][:3]
+        response = admin_client.post(
+            reverse('api:batch-reviews-list'),
+            review_items(titles, users), format='json'
+        )
+        assert {result['status'] for result in response.json()} == {201}
+        assert recalculate_ratings(fix=False) == [], (
+            'Проверьте, что пакет отзывов учтён в рейтинге произведений'
+        )
+        incremental = {
+            stats.title_id: (stats.histogram, stats.last_review)
+            for stats in TitleStats.objects.all()
+        }
+        rebuild_title_stats(Title.objects.filter(pk__in=incremental))
+        assert incremental == {
+            stats.title_id: (stats.histogram, stats.last_review)
+            for stats in TitleStats.objects.filter(title__in=incremental)
+        }, 'Проверьте, что пакет отзывов учтён в статистике оценок'
+
+    def test_reviews_batch_queries_do_not_depend_on_size(
+        self, catalogue, admin_client, django_user_model,
+        django_assert_max_num_queries
+    ):
+        users = [
+            django_user_model.objects.create(
+                username=f'batch{i}', email=f'batch{i}@yamdb.fake'
+            )
+            for i in range(20)
+        ]
+        titles = catalogue['titles'][1:3]
+        url = reverse('api:batch-reviews-list')
+        # Точка сохранения, пользователи, произведения, отзывы, вставка,
+        # идентификаторы (SQLite) и на каждое произведение - рейтинг и
+        # статистика (при первом отзыве - с созданием строки).
+        for batch in (users[:2], users[2:]):
+            with django_assert_max_num_queries(7 + 6 * len(titles)):
+                response = admin_client.post(
+                    url, review_items(titles, batch), format='json'
+                )
+            assert response.status_code == 207
+
+    def test_comments_batch(self, catalogue, admin_client):
+        review = catalogue['review']
+        response = admin_client.post(reverse('api:batch-comments-list'), [
+            {'review': review.pk, 'text': 'Первый'},
+            {'review': review.pk, 'text': 'Второй'},
+            {'review': 0, 'text': 'Нет отзыва'},
+        ], format='json')
+        assert response.status_code == 207
+        assert [result['status'] for result in response.json()] == [
+            201, 201, 400
+        ]
+        assert Comment.objects.filter(
+            review=review, text__in=('Первый', 'Второй')
+        ).count() == 2
+
+    def test_batch_limits(self, catalogue, admin_client, api_client):
+        url = reverse('api:batch-comments-list')
+        item = {'review': catalogue['review'].pk, 'text': 'Текст'}
+        assert api_client.post(url, [item], format='json').status_code in (
+            401, 403
+        )
+        assert admin_client.post(url, [], format='json').status_code == 400
+        with override_settings(BATCH_MAX_ITEMS=2):
+            response = admin_client.post(url, [item] * 3, format='json')
+        assert response.status_code == 400
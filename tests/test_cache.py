@@ -0,0 +1,57 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_repeated_read_is_served_from_cache(
+        self, catalogue, api_client, django_assert_num_queries
+    ):
+        url = reverse('api:titles-list')
+        response = api_client.get(url, {'year': 2001, 'limit': 5})
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            cached = api_client.get(url, {'limit': 5, 'year': 2001})
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос с теми же параметрами '
+            'отдаётся из кеша'
+        )
+        assert cached.json() == response.json()
+
+    def test_cache_disabled(self, catalogue, api_client, settings):
+        settings.API_CACHE_ENABLED = False
+        url = reverse('api:categories-list')
+        api_client.get(url)
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert not response.has_header('X-Cache'), (
+            'Проверьте, что при API_CACHE_ENABLED=False ответы не кешируются'
+        )
+
+    def test_write_invalidates_cached_pages(
+        self, catalogue, admin_client, django_capture_on_commit_callbacks
+    ):
+        url = reverse('api:categories-list')
+        before = admin_client.get(url).json()
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(url, {'name': 'Новая', 'slug': 'new'})
+        response = admin_client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что после записи кеш ответов сбрасывается'
+        )
+        assert response.json()['count'] == before['count'] + 1
+
+    def test_review_invalidates_title_rating(
+        self, catalogue, admin, admin_client,
+        django_capture_on_commit_callbacks
+    ):
+        title = catalogue['titles'][1]
+        url = reverse('api:titles-detail', kwargs={'pk': title.pk})
+        assert admin_client.get(url).json()['rating'] is None
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(
+                reverse('api:reviews-list', kwargs={'title_id': title.pk}),
+                {'text': 'Отзыв', 'score': 7}
+            )
+        assert admin_client.get(url).json()['rating'] == 7
@@ -0,0 +1,88 @@
+import pytest
+from django.urls import reverse
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db
+class TestCatalogueBatch:
+
+    def test_genres_upsert(self, catalogue, admin_client):
+        response = admin_client.post(reverse('api:batch-genres-list'), [
+            {'name': 'Жанр 0 (новое название)', 'slug': 'genre-0'},
+            {'name': 'Новый жанр', 'slug': 'new-genre'},
+            {'name': 'Жанр 1', 'slug': 'other'},
+            {'name': 'Ещё раз', 'slug': 'new-genre'},
+            {'name': 'Без адреса', 'slug': 'не slug'},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            200, 201, 400, 400, 400
+        ]
+        assert results[1]['slug'] == 'new-genre'
+        assert 'name' in results[2]['errors']
+        assert Genre.objects.get(slug='genre-0').name == (
+            'Жанр 0 (новое название)'
+        )
+        assert Genre.objects.filter(slug='new-genre').exists()
+
+    def test_categories_upsert(self, catalogue, admin_client):
+        response = admin_client.post(reverse('api:batch-categories-list'), [
+            {'name': 'Книги', 'slug': 'books'},
+        ], format='json')
+        assert response.json()[0]['status'] == 201
+        assert Category.objects.filter(slug='books').exists()
+
+    def test_titles_upsert(self, catalogue, admin_client):
+        existing = catalogue['titles'][1]
+        response = admin_client.post(reverse('api:batch-titles-list'), [
+            {'name': existing.name, 'year': 1999, 'category': 'category-2',
+             'genre': ['genre-0']},
+            {'name': 'Новое', 'year': 2001, 'category': 'category-0',
+             'genre': ['genre-1', 'genre-2'], 'description': 'Описание'},
+            {'name': 'Без жанра', 'year': 2001, 'category': 'category-0',
+             'genre': ['missing']},
+            {'name': 'Новое', 'year': 2002, 'category': 'category-0',
+             'genre': []},
+            {'name': 'Из будущего', 'year': 3000, 'category': 'category-0',
+             'genre': []},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            200, 201, 400, 400, 400
+        ]
+        assert 'genre' in results[2]['errors']
+        existing.refresh_from_db()
+        assert existing.year == 1999
+        assert existing.category.slug == 'category-2'
+        assert list(existing.genre.values_list('slug', flat=True)) == [
+            'genre-0'
+        ]
+        created = Title.objects.get(pk=results[1]['id'])
+        assert created.name == 'Новое'
+        assert sorted(created.genre.values_list('slug', flat=True)) == [
+            'genre-1', 'genre-2'
+        ]
+
+    def test_titles_batch_queries_do_not_depend_on_size(
+        self, catalogue, admin_client, django_assert_max_num_queries
+    ):
+        url = reverse('api:batch-titles-list')
+        # Точка сохранения, жанры, категории, произведения, вставка,
+        # идентификаторы (SQLite), обновление, выборка и удаление старых
+        # связей с жанрами, вставка новых.
+        for size in (2, 50):
+            items = [
+                {'name': f'Пакет {size} {i}', 'year': 2000,
+                 'category': f'category-{i % 3}',
+                 'genre': [f'genre-{i % 4}', 'genre-3']}
+                for i in range(size)
+            ] + [{'name': 'Произведение 0', 'year': 2000,
+                  'category': 'category-0', 'genre': ['genre-0']}]
+            with django_assert_max_num_queries(11):
+                response = admin_client.post(url, items, format='json')
+            assert {
+                result['status'] for result in response.json()
+            } == {200, 201}
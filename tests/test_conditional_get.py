@@ -0,0 +1,93 @@
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_reviews_not_modified(
+        self, catalogue, api_client, django_assert_max_num_queries
+    ):
+        url = reverse(
+            'api:reviews-list', kwargs={'title_id': catalogue['title'].pk}
+        )
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag')
+        assert not response.has_header('Last-Modified')
+        with django_assert_max_num_queries(2):
+            response = api_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+
+    def test_etag_changes_after_write(
+        self, catalogue, admin_client, django_capture_on_commit_callbacks
+    ):
+        review = catalogue['review']
+        url = reverse('api:comments-list', kwargs={
+            'title_id': catalogue['title'].pk, 'review_id': review.pk
+        })
+        etag = admin_client.get(url)['ETag']
+        comment = review.comments.first()
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.patch(
+                f'{url}{comment.pk}/', {'text': 'Исправленный текст'}
+            )
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения комментария ETag меняется'
+        )
+
+    def test_if_modified_since_after_edit(
+        self, catalogue, admin_client, django_capture_on_commit_callbacks
+    ):
+        title = catalogue['title']
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        admin_client.get(url)
+        # Старый отзыв правится после запроса клиента: дата публикации
+        # самого нового отзыва при этом не меняется.
+        review = title.reviews.order_by('pub_date').first()
+        since = http_date()
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.patch(
+                f'{url}{review.pk}/', {'text': 'Исправленный текст'}
+            )
+        response = admin_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200, (
+            'Проверьте, что If-Modified-Since не возвращает 304 после'
+            ' изменения отзыва'
+        )
+
+    def test_etag_without_shared_generations(
+        self, catalogue, admin_client, settings
+    ):
+        # Кеш процесса при нескольких воркерах: поколения в нём не видят
+        # записей в других воркерах. Здесь поколения тоже не меняются:
+        # обработчики on_commit в тесте не выполняются.
+        settings.API_CACHE_ENABLED = False
+        title = catalogue['title']
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        etag = admin_client.get(url)['ETag']
+        assert admin_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304
+        review = title.reviews.order_by('-pub_date').first()
+        admin_client.patch(f'{url}{review.pk}/', {'text': 'Новый текст'})
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что без общего кеша ETag меняется после изменения'
+            ' отзыва, при котором количество отзывов то же'
+        )
+
+    def test_cached_title_not_modified(self, catalogue, api_client):
+        url = reverse(
+            'api:titles-detail', kwargs={'pk': catalogue['title'].pk}
+        )
+        etag = api_client.get(url)['ETag']
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['X-Cache'] == 'HIT'
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+class TestHealthChecks:
+
+    @pytest.fixture
+    def closed(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        monkeypatch.setattr(connection, 'close', lambda: calls.append(1))
+        return calls
+
+    @pytest.mark.django_db(transaction=True)
+    def test_unusable_connection_closed_on_first_use(
+        self, monkeypatch, closed
+    ):
+        from api_yamdb.db import check_connections_on_first_use
+
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', True)
+        check_connections_on_first_use()
+        assert not closed, (
+            'Проверьте, что соединение не проверяется до обращения к БД'
+        )
+        connection.ensure_connection()
+        connection.ensure_connection()
+        assert closed == [1], (
+            'Проверьте, что неработающее постоянное соединение закрывается'
+            ' при первом обращении к БД в запросе'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_no_check_without_queries(
+        self, monkeypatch, catalogue, api_client
+    ):
+        checks = []
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', True)
+        monkeypatch.setattr(
+            connection, 'is_usable', lambda: checks.append(1) or True
+        )
+        url = f'/api/v1/titles/{catalogue["title"].pk}/'
+        etag = api_client.get(url)['ETag']
+        checks.clear()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response['X-Cache'] == 'HIT'
+        assert not checks, (
+            'Проверьте, что ответ из кеша не проверяет соединение с БД'
+        )
+
+    @pytest.mark.django_db
+    def test_checks_disabled(self, monkeypatch, closed):
+        from api_yamdb.db import check_connections_on_first_use
+
+        monkeypatch.setitem(connection.settings_dict, 'CONN_HEALTH_CHECKS', False)
+        check_connections_on_first_use()
+        connection.ensure_connection()
+        assert not closed
+
+
+@pytest.mark.django_db
+def test_benchmark_connections(catalogue, tmp_path):
+    output = tmp_path / 'connections.json'
+    call_command('benchmark_connections', requests=3, output=str(output))
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['path'] == (
+        f'/api/v1/titles/{catalogue["title"].pk}/reviews/'
+    )
+    assert [result['statuses'] for result in report['results']] == (
+        [['200 OK']] * 3
+    )
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestFieldsets:
+
+    def test_default_response_is_unchanged(self, catalogue, api_client):
+        title = api_client.get(reverse('api:titles-list')).json()[
+            'results'
+        ][0]
+        assert set(title) == {
+            'id', 'name', 'year', 'rating', 'description', 'genre',
+            'category'
+        }
+        assert set(title['category']) == {'name', 'slug'}
+        assert set(title['genre'][0]) == {'name', 'slug'}
+
+    def test_fields_narrow_response_and_sql(self, catalogue, api_client):
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(
+                reverse('api:titles-list'), {'fields': 'id,name,rating'}
+            )
+        assert response.status_code == 200
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        assert 'description' not in sql, (
+            'Проверьте, что неиспользуемые столбцы не читаются'
+        )
+        assert 'reviews_genre' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что жанры и категории не загружаются, если их нет'
+            ' в ответе'
+        )
+
+    def test_expand(self, catalogue, api_client):
+        url = reverse(
+            'api:titles-detail', kwargs={'pk': catalogue['title'].pk}
+        )
+        title = api_client.get(
+            url, {'fields': 'id,genre,category', 'expand': 'category'}
+        ).json()
+        assert title['category'] == {
+            'name': catalogue['title'].category.name,
+            'slug': catalogue['title'].category.slug,
+        }
+        assert sorted(title['genre']) == sorted(
+            catalogue['title'].genre.values_list('slug', flat=True)
+        )
+        title = api_client.get(url, {'expand': ''}).json()
+        assert title['category'] == catalogue['title'].category.slug
+
+    def test_unknown_fields(self, catalogue, api_client):
+        url = reverse('api:titles-list')
+        for params in ({'fields': 'id,secret'}, {'expand': 'author'}):
+            assert api_client.get(url, params).status_code == 400, (
+                f'Проверьте, что {params} с неизвестным полем возвращает 400'
+            )
+
+    def test_fields_on_reviews(self, catalogue, api_client, admin_client):
+        url = reverse(
+            'api:reviews-list', kwargs={'title_id': catalogue['title'].pk}
+        )
+        for review in api_client.get(
+            url, {'fields': 'id,score'}
+        ).json()['results']:
+            assert set(review) == {'id', 'score'}
+        other = catalogue['titles'][1]
+        response = admin_client.post(
+            reverse('api:reviews-list', kwargs={'title_id': other.pk}) +
+            '?fields=id', {'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что fields не влияет на проверку тела запроса'
+        )
@@ -0,0 +1,23 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_title_filters_use_indexes(tmp_path):
+    from reviews.models import Title
+
+    output = tmp_path / 'plans.json'
+    call_command(
+        'benchmark_title_filters', titles=2000, repeat=1,
+        output=str(output), fail_on_scan=True
+    )
+    results = json.loads(output.read_text(encoding='utf-8'))['results']
+    assert len(results) == 16, (
+        'Проверьте, что замеряются все сочетания фильтров'
+    )
+    assert all(result['rows'] > 0 for result in results)
+    assert not Title.objects.exists(), (
+        'Проверьте, что синтетический каталог откатывается'
+    )
@@ -0,0 +1,60 @@
+import runpy
+from os.path import join
+
+from .conftest import root_dir
+
+CONFIG = join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **environ):
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG)
+
+
+class TestGunicornConf:
+
+    def test_defaults(self, monkeypatch):
+        monkeypatch.delenv('SERVER_MODE', raising=False)
+        config = load_config(monkeypatch)
+        assert config['wsgi_app'] == 'api_yamdb.wsgi:application'
+        assert config['worker_class'] == 'gthread'
+        assert config['preload_app'] is True
+        assert 1 <= config['workers'] <= 2 * config['cpu_count']() + 1
+        assert config['max_requests_jitter'] == config['max_requests'] // 10
+
+    def test_asgi_mode(self, monkeypatch):
+        config = load_config(monkeypatch, SERVER_MODE='asgi')
+        assert config['wsgi_app'] == 'api_yamdb.asgi:application'
+        assert config['worker_class'] == 'uvicorn.workers.UvicornWorker'
+
+    def test_environment_overrides(self, monkeypatch):
+        config = load_config(
+            monkeypatch, GUNICORN_WORKERS='3', GUNICORN_PRELOAD='false',
+            GUNICORN_THREADS='1'
+        )
+        assert config['workers'] == 3
+        assert config['preload_app'] is False
+        assert config['worker_class'] == 'sync'
+
+    def test_local_cache_disabled_with_several_workers(self, monkeypatch):
+        monkeypatch.delenv('CACHE_BACKEND', raising=False)
+        config = load_config(monkeypatch, GUNICORN_WORKERS='3')
+        assert 'API_CACHE_ENABLED=false' in config['raw_env'], (
+            'Проверьте, что кеш ответов в памяти процесса отключается,'
+            ' если воркеров несколько'
+        )
+        config = load_config(monkeypatch, GUNICORN_WORKERS='1')
+        assert 'API_CACHE_ENABLED=false' not in config['raw_env']
+        config = load_config(
+            monkeypatch, GUNICORN_WORKERS='3',
+            CACHE_BACKEND='django_redis.cache.RedisCache'
+        )
+        assert 'API_CACHE_ENABLED=false' not in config['raw_env']
+
+    def test_workers_limited_by_memory(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_WORKER_MEMORY_MB='150')
+        default_workers = config['default_workers']
+        default_workers.__globals__['memory_limit_mb'] = lambda: 400
+        default_workers.__globals__['cpu_count'] = lambda: 8
+        assert default_workers() == 2
@@ -0,0 +1,127 @@
+import csv
+
+import pytest
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as fdata:
+        writer = csv.writer(fdata)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.mark.django_db
+class TestTableImporter:
+
+    def test_reviews_are_loaded_and_rejected_rows_saved(
+        self, catalogue, tmp_path
+    ):
+        from reviews.importer import TableImporter
+        from reviews.models import Review, Title
+
+        title = catalogue['titles'][1]
+        author = catalogue['review'].author
+        fdata = write_csv(
+            tmp_path / 'review.csv',
+            ['id', 'title_id', 'text', 'author', 'score', 'pub_date'],
+            [
+                (1001, title.pk, 'Отзыв', author.pk, 8,
+                 '2019-09-24T21:08:21.567Z'),
+                (1002, title.pk, 'Повтор', author.pk, 2,
+                 '2019-09-24T21:08:21.567Z'),
+                (1003, 100500, 'Нет произведения', author.pk, 5,
+                 '2019-09-24T21:08:21.567Z'),
+                (1004, catalogue['titles'][2].pk, 'Оценка', author.pk, 11,
+                 '2019-09-24T21:08:21.567Z'),
+            ]
+        )
+        importer = TableImporter(
+            Review, fdata, rejects_dir=str(tmp_path / 'rejected')
+        ).load()
+
+        assert importer.loaded == 1
+        assert importer.rejected == 3
+        review = Review.objects.get(pk=1001)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+        assert Title.objects.get(pk=title.pk).rating == 8, (
+            'Проверьте, что рейтинг пересчитывается после загрузки'
+        )
+        with open(importer.rejects_path, encoding='utf-8') as rejects:
+            rejected = list(csv.DictReader(rejects))
+        assert [row['id'] for row in rejected] == ['1002', '1003', '1004']
+        assert all(row['error'] for row in rejected)
+
+
+    def test_overwrite_keeps_title_rating(self, catalogue, tmp_path):
+        from reviews.importer import TableImporter
+        from reviews.models import Title
+
+        title = catalogue['title']
+        title.refresh_from_db()
+        assert title.rating_count
+        rating = (title.rating_sum, title.rating_count, title.rating)
+        fdata = write_csv(
+            tmp_path / 'titles.csv',
+            ['id', 'name', 'year', 'category'],
+            [(title.pk, 'Новое название', 1999, title.category_id)]
+        )
+        TableImporter(Title, fdata, overwrite=True).load()
+
+        title.refresh_from_db()
+        assert title.name == 'Новое название'
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            rating
+        ), 'Проверьте, что перезапись произведения не сбрасывает рейтинг'
+
+
+class TestDependencyOrder:
+
+    def test_graph_is_built_from_foreign_keys(self):
+        from reviews.importer import dependency_graph, dependency_order
+        from reviews.models import (
+            Category, Comment, Genre, GenreTitle, Review, Title
+        )
+        from users.models import User
+
+        graph = dependency_graph({
+            'category': Category, 'genre': Genre, 'title': Title,
+            'genretitle': GenreTitle, 'user': User, 'review': Review,
+            'comment': Comment,
+        })
+        assert graph['category'] == graph['genre'] == graph['user'] == set()
+        assert graph['genretitle'] == {'title', 'genre'}
+        assert graph['review'] == {'title', 'user'}
+        assert graph['comment'] == {'review', 'user'}
+        assert dependency_order(graph) == [
+            'category', 'genre', 'user', 'title', 'genretitle', 'review',
+            'comment'
+        ]
+
+    def test_independent_tables_run_concurrently(self):
+        import threading
+
+        from reviews.importer import run_in_dependency_order
+
+        barrier = threading.Barrier(3, timeout=5)
+
+        def task(name):
+            if name in ('a', 'b', 'c'):
+                # Завершится, только если все три таблицы запущены вместе.
+                barrier.wait()
+            if name == 'e':
+                raise RuntimeError('ошибка загрузки')
+            return name
+
+        results, errors, skipped = run_in_dependency_order(
+            {'a': set(), 'b': set(), 'c': set(), 'd': {'a', 'b'},
+             'e': {'c'}, 'f': {'e'}},
+            task, jobs=3
+        )
+        assert set(results) == {'a', 'b', 'c', 'd'}
+        assert list(errors) == ['e']
+        assert skipped == ['f'], (
+            'Проверьте, что зависящие от упавшей таблицы не загружаются'
+        )
@@ -0,0 +1,82 @@
+import io
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+DATA = {
+    'name': 'Произведение «Мастер и Маргарита»',
+    'text': 'Строка\u2028и абзац\u2029',
+    'rating': None,
+    'mean': Decimal('7.25'),
+    'ratio': 0.1,
+    'lazy': gettext_lazy('Книги'),
+    'utc': datetime(2023, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    'moscow': datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=3))),
+    'naive': datetime(2023, 1, 2, 3, 4, 5),
+    'date': date(2023, 1, 2),
+    'scores': {1: 2, 10: 0},
+    'genres': ({'slug': 'drama'}, {'slug': 'comedy'}),
+    'big': 2 ** 70,
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def fast_module(request, monkeypatch):
+    """Проверки выполняются с orjson и без него."""
+    from api.v1 import parsers, renderers
+
+    if request.param == 'json':
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+    return renderers, parsers
+
+
+def test_render_same_as_drf(fast_module):
+    renderers, _ = fast_module
+    # Целое больше 64 бит orjson не кодирует - ответ рендерит JSONRenderer.
+    small = {key: value for key, value in DATA.items() if key != 'big'}
+    for data in (DATA, small):
+        assert renderers.FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        )
+
+
+def test_render_indent(fast_module):
+    renderers, _ = fast_module
+    media_type = 'application/json; indent=4'
+    assert renderers.FastJSONRenderer().render(DATA, media_type) == (
+        JSONRenderer().render(DATA, media_type)
+    )
+    assert renderers.FastJSONRenderer().render(None) == b''
+
+
+def test_parse_same_as_drf(fast_module):
+    _, parsers = fast_module
+    body = JSONRenderer().render(DATA)
+    assert parsers.FastJSONParser().parse(io.BytesIO(body)) == (
+        JSONParser().parse(io.BytesIO(body))
+    )
+    for invalid in (b'{"score": NaN}', b'{"score": ', b'\xff'):
+        with pytest.raises(ParseError) as fast_error:
+            parsers.FastJSONParser().parse(io.BytesIO(invalid))
+        with pytest.raises(ParseError) as error:
+            JSONParser().parse(io.BytesIO(invalid))
+        assert str(fast_error.value) == str(error.value)
+
+
+@pytest.mark.django_db
+def test_api_uses_fast_json(catalogue, admin_client):
+    response = admin_client.post(
+        '/api/v1/categories/',
+        '{"name": "Фильмы", "slug": "movie"}',
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+    assert response.content == (
+        '{"name":"Фильмы","slug":"movie"}'.encode('utf-8')
+    )
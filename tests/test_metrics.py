@@ -0,0 +1,55 @@
+import pytest
+from prometheus_client import REGISTRY
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_request_metrics(self, catalogue, api_client):
+        labels = {'resource': 'genres', 'action': 'list'}
+        requests = sample('api_requests_total', status='2xx', **labels)
+        observed = sample('api_request_duration_seconds_count', **labels)
+        hits = sample('api_response_cache_total', result='hit')
+
+        api_client.get('/api/v1/genres/')
+        api_client.get('/api/v1/genres/')
+
+        assert sample(
+            'api_requests_total', status='2xx', **labels
+        ) == requests + 2
+        assert sample(
+            'api_request_duration_seconds_count', **labels
+        ) == observed + 2
+        assert sample('api_response_cache_total', result='hit') == hits + 1
+
+    def test_action_labels(self, catalogue, api_client):
+        title_id = catalogue['title'].pk
+        api_client.get(f'/api/v1/titles/{title_id}/')
+        api_client.post('/api/v1/auth/signup/', {})
+        assert sample(
+            'api_requests_total',
+            resource='titles', action='retrieve', status='2xx'
+        )
+        assert sample(
+            'api_requests_total',
+            resource='signup', action='post', status='4xx'
+        )
+
+    def test_metrics_endpoint(self, api_client):
+        from users.outbox import queue_mail
+
+        queue_mail('Тема', 'Текст', 'from@yamdb.fake', ['to@yamdb.fake'])
+        response = api_client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert 'email_outbox_pending 1.0' in body
+        assert 'api_request_duration_seconds_bucket' in body
+
+    def test_metrics_disabled(self, api_client, settings):
+        settings.METRICS_ENABLED = False
+        assert api_client.get('/metrics').status_code == 404
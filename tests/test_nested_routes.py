@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    def test_missing_title_is_not_found(self, catalogue, api_client):
+        url = reverse('api:reviews-list', kwargs={'title_id': 0})
+        response = api_client.get(url)
+        assert response.status_code == 404, (
+            'Проверьте, что список отзывов несуществующего произведения'
+            ' возвращает 404'
+        )
+
+    def test_empty_list_of_existing_title(self, catalogue, api_client,
+                                          django_assert_max_num_queries):
+        title = Title.objects.create(name='Без отзывов', year=2000)
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        with django_assert_max_num_queries(3):
+            response = api_client.get(url)
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+
+    def test_review_of_another_title_is_not_found(self, catalogue,
+                                                  admin_client):
+        review = catalogue['review']
+        other = catalogue['titles'][1]
+        for name, kwargs in (
+            ('comments-list', {'title_id': other.pk,
+                               'review_id': review.pk}),
+            ('reviews-detail', {'title_id': other.pk, 'pk': review.pk}),
+        ):
+            url = reverse(f'api:{name}', kwargs=kwargs)
+            assert admin_client.get(url).status_code == 404, (
+                f'Проверьте, что {url} возвращает 404: отзыв относится'
+                ' к другому произведению'
+            )
+            assert admin_client.patch(
+                url, {'text': 'Изменено'}
+            ).status_code in (404, 405)
+
+    def test_comment_create_loads_review_once(
+        self, catalogue, admin_client, django_assert_max_num_queries
+    ):
+        review = catalogue['review']
+        url = reverse('api:comments-list', kwargs={
+            'title_id': review.title_id, 'review_id': review.pk
+        })
+        # Отзыв, вставка комментария и автор для ответа.
+        with django_assert_max_num_queries(3):
+            response = admin_client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 201
+        missing = reverse('api:comments-list', kwargs={
+            'title_id': catalogue['titles'][1].pk, 'review_id': review.pk
+        })
+        assert admin_client.post(
+            missing, {'text': 'Комментарий'}
+        ).status_code == 404
@@ -0,0 +1,99 @@
+import smtplib
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_queues_mail_for_worker(self, api_client):
+        from users.models import EmailOutbox
+
+        response = api_client.post(
+            reverse('api:signup'),
+            {'username': 'reader', 'email': 'reader@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что письмо не отправляется во время запроса'
+        )
+        queued = EmailOutbox.objects.get()
+        assert queued.to_email == 'reader@yamdb.fake'
+
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == 1
+        assert 'reader' in mail.outbox[0].body
+        queued.refresh_from_db()
+        assert queued.sent_at is not None
+
+    def test_failed_mail_is_retried_later(self, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from users.models import EmailOutbox
+        from users.outbox import queue_mail
+
+        queue_mail('Тема', 'Текст', 'from@yambd.com', ['a@yamdb.fake'])
+
+        def fail(self, messages):
+            raise smtplib.SMTPServerDisconnected('соединение разорвано')
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', fail)
+        call_command('send_outbox', once=True)
+        queued = EmailOutbox.objects.get()
+        assert queued.sent_at is None
+        assert queued.attempts == 1
+        assert 'SMTPServerDisconnected' in queued.last_error
+        assert queued.send_after > queued.created_at, (
+            'Проверьте, что повторная отправка откладывается'
+        )
+
+    def test_mail_sent_outside_transaction(self, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.db import connection
+
+        from users.models import EmailOutbox
+        from users.outbox import queue_mail
+
+        queue_mail('Тема', 'Текст', 'from@yambd.com', ['a@yamdb.fake'])
+        send_messages = EmailBackend.send_messages
+        claimed = []
+
+        def send(self, messages):
+            # Пачка уже забрана и зафиксирована: транзакция не открыта.
+            claimed.extend(EmailOutbox.objects.filter(
+                send_after__gt=timezone.now()
+            ))
+            assert connection.savepoint_ids == [], (
+                'Проверьте, что письма отправляются вне транзакции'
+            )
+            return send_messages(self, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', send)
+        call_command('send_outbox', once=True)
+        assert len(claimed) == 1
+        assert EmailOutbox.objects.get().sent_at is not None
+
+    def test_sent_mail_purged(self):
+        from users.models import EmailOutbox
+        from users.outbox import purge_sent, queue_mail
+
+        queue_mail(
+            'Тема', 'Текст', 'from@yambd.com',
+            ['a@yamdb.fake', 'b@yamdb.fake', 'c@yamdb.fake']
+        )
+        now = timezone.now()
+        EmailOutbox.objects.filter(to_email='a@yamdb.fake').update(
+            sent_at=now - timedelta(days=30)
+        )
+        EmailOutbox.objects.filter(to_email='b@yamdb.fake').update(
+            sent_at=now
+        )
+        assert purge_sent(retention=24 * 60 * 60) == 1
+        assert set(EmailOutbox.objects.values_list('to_email', flat=True)) == {
+            'b@yamdb.fake', 'c@yamdb.fake'
+        }
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_cursor_pages_cover_all_reviews(
+        self, catalogue, api_client, django_assert_max_num_queries
+    ):
+        title = catalogue['title']
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        seen = []
+        response = api_client.get(url, {'pagination': 'cursor'})
+        while True:
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что пагинация по курсору не считает COUNT(*)'
+            )
+            seen.extend(review['id'] for review in data['results'])
+            if not data['next']:
+                break
+            with django_assert_max_num_queries(3):
+                response = api_client.get(data['next'])
+        expected = list(
+            title.reviews.order_by('-pub_date', 'id').values_list(
+                'id', flat=True
+            )
+        )
+        assert seen == expected
+
+    def test_cursor_validators_without_count(self, catalogue, api_client):
+        url = reverse(
+            'api:reviews-list', kwargs={'title_id': catalogue['title'].pk}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == 200
+        with CaptureQueriesContext(connection) as revalidation:
+            not_modified = api_client.get(
+                url, {'pagination': 'cursor'},
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert not_modified.status_code == 304
+        sql = [
+            query['sql']
+            for query in queries.captured_queries
+            + revalidation.captured_queries
+        ]
+        assert not any('COUNT(' in statement for statement in sql), (
+            'Проверьте, что в режиме курсора ETag строится без COUNT(*)'
+        )
+
+    def test_cursor_missing_title_is_not_found(self, catalogue, api_client):
+        url = reverse('api:reviews-list', kwargs={'title_id': 0})
+        response = api_client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == 404
+
+    def test_page_number_mode_is_default(self, catalogue, api_client):
+        url = reverse(
+            'api:reviews-list', kwargs={'title_id': catalogue['title'].pk}
+        )
+        data = api_client.get(url, {'page': 2}).json()
+        assert data['count'] == catalogue['title'].reviews.count()
@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+
+# Максимальное количество запросов к БД на один вызов эндпоинта
+# (без кеша ответов). Бюджет не зависит от числа объектов на странице:
+# рост количества запросов вместе с размером страницы означает N+1.
+# Один запрос в каждом эндпоинте каталога, отзывов и комментариев -
+# количество строк для ETag. Отзывы и комментарии фильтруются по
+# ключам родителя из URL без отдельного запроса к родителю.
+QUERY_BUDGETS = {
+    'categories-list': 3,
+    'genres-list': 3,
+    'titles-list': 4,
+    'titles-detail': 3,
+    'titles-stats': 1,
+    'titles-stats-list': 2,
+    'reviews-list': 3,
+    'reviews-detail': 2,
+    'comments-list': 3,
+    'comments-detail': 2,
+    'user-list': 2,
+}
+
+
+def endpoint_url(name, catalogue):
+    title = catalogue['title']
+    review = catalogue['review']
+    kwargs = {
+        'titles-detail': {'pk': title.pk},
+        'titles-stats': {'pk': title.pk},
+        'reviews-list': {'title_id': title.pk},
+        'reviews-detail': {'title_id': title.pk, 'pk': review.pk},
+        'comments-list': {'title_id': title.pk, 'review_id': review.pk},
+        'comments-detail': {
+            'title_id': title.pk,
+            'review_id': review.pk,
+            'pk': review.comments.first().pk,
+        },
+    }.get(name, {})
+    return reverse(f'api:{name}', kwargs=kwargs)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('name', sorted(QUERY_BUDGETS))
+    def test_query_budget(self, name, catalogue, admin_client,
+                          django_assert_max_num_queries):
+        url = endpoint_url(name, catalogue)
+        with django_assert_max_num_queries(QUERY_BUDGETS[name]):
+            response = admin_client.get(url, {'limit': 100})
+        assert response.status_code == 200, (
+            f'Проверьте, что GET {url} возвращает статус 200'
+        )
+
+    @pytest.mark.parametrize('name', ['titles-list', 'user-list'])
+    def test_query_count_does_not_depend_on_page_size(
+        self, name, catalogue, admin_client, django_assert_num_queries
+    ):
+        url = endpoint_url(name, catalogue)
+        with django_assert_num_queries(QUERY_BUDGETS[name]):
+            admin_client.get(url, {'limit': 1})
+        with django_assert_num_queries(QUERY_BUDGETS[name]):
+            admin_client.get(url, {'limit': 100})
@@ -0,0 +1,158 @@
+import pytest
+from django.core.management import (
+    CommandError, ManagementUtility, call_command
+)
+from django.test import Client
+
+from reviews.aggregates import recalculate_ratings
+from reviews.models import Review, Title
+
+
+def assert_rating(title, scores):
+    title.refresh_from_db()
+    assert (title.rating_sum, title.rating_count) == (
+        sum(scores), len(scores)
+    )
+    assert title.rating == (
+        pytest.approx(sum(scores) / len(scores)) if scores else None
+    )
+    assert recalculate_ratings(fix=False) == [], (
+        'Проверьте, что рейтинг совпадает с пересчётом с нуля'
+    )
+
+
+def scores_of(title):
+    return list(title.reviews.values_list('score', flat=True))
+
+
+@pytest.fixture
+def site_admin(django_user_model):
+    user = django_user_model.objects.create_superuser(
+        username='root', email='root@yamdb.fake', password='password'
+    )
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestRatings:
+
+    def test_created_reviews_counted(self, catalogue):
+        title = catalogue['title']
+        assert_rating(title, [i % 10 + 1 for i in range(12)])
+        assert_rating(catalogue['titles'][1], [])
+
+    def test_score_change(self, catalogue):
+        title = catalogue['title']
+        review = title.reviews.get(score=10)
+        review.score = 1
+        review.save()
+        assert_rating(title, scores_of(title))
+
+    def test_review_moved_to_another_title(self, catalogue):
+        title, other = catalogue['title'], catalogue['titles'][1]
+        review = title.reviews.get(score=10)
+        review.title = other
+        review.score = 4
+        review.save()
+        assert_rating(title, scores_of(title))
+        assert_rating(other, [4])
+
+    def test_save_without_loaded_state(self, catalogue):
+        title = catalogue['title']
+        review = title.reviews.get(score=10)
+        Review(
+            pk=review.pk, title=title, author=review.author,
+            text=review.text, score=2, pub_date=review.pub_date
+        ).save()
+        assert_rating(title, scores_of(title))
+
+    def test_review_deleted(self, catalogue):
+        title = catalogue['title']
+        title.reviews.get(score=10).delete()
+        assert_rating(title, scores_of(title))
+        for review in title.reviews.all():
+            review.delete()
+        assert_rating(title, [])
+
+    def test_cascade_delete_of_author(self, catalogue):
+        title = catalogue['title']
+        title.reviews.get(score=10).author.delete()
+        assert_rating(title, scores_of(title))
+
+    def test_cascade_delete_of_title(self, catalogue):
+        title, other = catalogue['title'], catalogue['titles'][1]
+        review = title.reviews.first()
+        review.title = other
+        review.save()
+        other.delete()
+        assert_rating(title, scores_of(title))
+
+    def test_queryset_delete(self, catalogue):
+        title = catalogue['title']
+        title.reviews.filter(score__gte=5).delete()
+        assert_rating(title, scores_of(title))
+
+    def test_admin_change_and_delete(self, catalogue, site_admin):
+        title, other = catalogue['title'], catalogue['titles'][1]
+        review = title.reviews.get(score=10)
+        response = site_admin.post(
+            f'/admin/reviews/review/{review.pk}/change/', {
+                'title': other.pk, 'author': review.author.pk,
+                'text': review.text, 'score': 3, '_save': 'Сохранить',
+            }
+        )
+        assert response.status_code == 302
+        assert_rating(title, scores_of(title))
+        assert_rating(other, [3])
+        response = site_admin.post(
+            f'/admin/reviews/review/{review.pk}/delete/', {'post': 'yes'}
+        )
+        assert response.status_code == 302
+        assert_rating(other, [])
+        response = site_admin.post('/admin/reviews/review/', {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': list(
+                title.reviews.filter(score__lte=3).values_list(
+                    'pk', flat=True
+                )
+            ),
+        })
+        assert response.status_code == 302
+        assert_rating(title, scores_of(title))
+
+
+@pytest.mark.django_db
+class TestRecalculateRatingsCommand:
+
+    def test_check_fails_on_drift(self, catalogue, capsys):
+        title = catalogue['title']
+        call_command('recalculate_ratings', check=True)
+        Title.objects.filter(pk=title.pk).update(rating_sum=0)
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', check=True)
+        assert f'{title.pk} {title}' in capsys.readouterr().out
+        title.refresh_from_db()
+        assert title.rating_sum == 0, (
+            'Проверьте, что --check не изменяет данные'
+        )
+
+    def test_check_exit_code(self, catalogue):
+        Title.objects.filter(pk=catalogue['title'].pk).update(rating_count=1)
+        with pytest.raises(SystemExit) as exit_info:
+            ManagementUtility(
+                ['manage.py', 'recalculate_ratings', '--check']
+            ).execute()
+        assert exit_info.value.code != 0, (
+            'Проверьте, что recalculate_ratings --check завершается'
+            ' с ошибкой при расхождениях'
+        )
+
+    def test_fix(self, catalogue):
+        title = catalogue['title']
+        Title.objects.filter(pk=title.pk).update(
+            rating_sum=0, rating_count=0, rating=None
+        )
+        call_command('recalculate_ratings')
+        assert_rating(title, scores_of(title))
@@ -0,0 +1,48 @@
+import pytest
+from django.urls import reverse
+
+from reviews.models import Review
+
+# Запросы к БД на создание отзыва: произведение, вставка отзыва, рейтинг
+# и статистика произведения. Отдельной проверки уникальности нет - её
+# выполняет ограничение unique_review.
+CREATE_BUDGET = 8
+
+
+@pytest.mark.django_db
+class TestReviewWrites:
+
+    def test_create_query_budget(self, catalogue, admin_client,
+                                 django_assert_max_num_queries):
+        url = reverse(
+            'api:reviews-list', kwargs={'title_id': catalogue['title'].pk}
+        )
+        with django_assert_max_num_queries(CREATE_BUDGET):
+            response = admin_client.post(url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201, (
+            'Проверьте, что POST на список отзывов создаёт отзыв'
+        )
+
+    def test_duplicate_review_rejected(self, catalogue, admin_client):
+        title = catalogue['title']
+        url = reverse('api:reviews-list', kwargs={'title_id': title.pk})
+        admin_client.post(url, {'text': 'Отзыв', 'score': 7})
+        response = admin_client.post(url, {'text': 'Ещё отзыв', 'score': 3})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение возвращает 400'
+        )
+        assert 'non_field_errors' in response.json()
+        title.refresh_from_db()
+        assert title.rating_count == Review.objects.filter(
+            title=title
+        ).count(), (
+            'Проверьте, что отклонённый отзыв не учтён в рейтинге'
+        )
+
+    def test_missing_title_is_not_found(self, catalogue, admin_client):
+        url = reverse('api:reviews-list', kwargs={'title_id': 0})
+        response = admin_client.post(url, {})
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв на несуществующее произведение'
+            ' возвращает 404 до проверки полей'
+        )
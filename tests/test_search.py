@@ -0,0 +1,84 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+
+    def test_titles_search_is_ranked(self, catalogue, api_client):
+        from reviews.models import Title
+
+        titles = catalogue['titles']
+        Title.objects.filter(pk=titles[3].pk).update(
+            name='Мастер и Маргарита', description='Роман о мастере'
+        )
+        Title.objects.filter(pk=titles[5].pk).update(
+            description='Упоминается мастер'
+        )
+        response = api_client.get(
+            reverse('api:titles-list'), {'search': 'мастер'}
+        )
+        assert response.status_code == 200
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids == [titles[3].pk, titles[5].pk], (
+            'Проверьте, что поиск находит произведения по названию и '
+            'описанию и сортирует их по релевантности'
+        )
+
+    def test_admin_title_search_by_name(
+        self, catalogue, client, django_user_model
+    ):
+        from reviews.models import Title
+
+        titles = catalogue['titles']
+        Title.objects.filter(pk=titles[3].pk).update(name='Мастер')
+        Title.objects.filter(pk=titles[5].pk).update(
+            description='Упоминается мастер'
+        )
+        client.force_login(django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='password'
+        ))
+        response = client.get('/admin/reviews/title/', {'q': 'мастер'})
+        assert response.status_code == 200
+        assert [title.pk for title in response.context['cl'].result_list] == [
+            titles[3].pk
+        ], 'Проверьте, что поиск в админ-панели ищет только по названию'
+
+    def test_review_and_comment_search_follows_changes(
+        self, catalogue, api_client
+    ):
+        review = catalogue['review']
+        review.text = 'Неожиданная концовка'
+        review.save()
+        comment = review.comments.first()
+        comment.text = 'Согласен, концовка неожиданная'
+        comment.save()
+
+        response = api_client.get(
+            reverse('api:search-reviews-list'), {'search': 'концовка'}
+        )
+        results = response.json()['results']
+        assert [item['id'] for item in results] == [review.pk]
+        assert results[0]['title'] == review.title_id
+        assert results[0]['rank'] > 0
+
+        response = api_client.get(
+            reverse('api:search-comments-list'), {'search': 'концов'}
+        )
+        results = response.json()['results']
+        assert [item['id'] for item in results] == [comment.pk]
+        assert results[0]['review'] == review.pk
+
+        review.delete()
+        response = api_client.get(
+            reverse('api:search-reviews-list'), {'search': 'концовка'}
+        )
+        assert response.json()['results'] == [], (
+            'Проверьте, что удалённые отзывы исключаются из индекса'
+        )
+
+    def test_empty_query_is_rejected(self, api_client):
+        response = api_client.get(
+            reverse('api:search-reviews-list'), {'search': ' "* '}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    from api import slow_queries
+
+    slow_queries._described.clear()
+    settings.SLOW_QUERY_THRESHOLD_MS = 0.000001
+    settings.SLOW_QUERY_LOG = str(tmp_path / 'slow.jsonl')
+    yield tmp_path / 'slow.jsonl'
+    slow_queries._described.clear()
+
+
+def read_log(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_fingerprint_ignores_values():
+    from api.slow_queries import fingerprint
+
+    assert fingerprint(
+        'SELECT * FROM t WHERE id IN (%s, %s) LIMIT 10'
+    ) == fingerprint(
+        'SELECT *  FROM t WHERE id IN (%s, %s, %s)\nLIMIT 20'
+    )
+    assert fingerprint('SELECT a FROM t') != fingerprint('SELECT b FROM t')
+
+
+@pytest.mark.django_db
+def test_explain_error_does_not_break_request():
+    from django.db import connection
+
+    from api.slow_queries import explain
+
+    with connection.execute_wrapper(pytest.fail):
+        plan = explain(connection, 'SELECT * FROM missing_table', None)
+    assert plan.startswith('EXPLAIN не выполнен'), (
+        'Проверьте, что ошибка EXPLAIN не пробрасывается в запрос'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        assert cursor.fetchone() == (1,)
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+
+    def test_slow_queries_logged(self, catalogue, api_client, slow_log):
+        url = f'/api/v1/titles/{catalogue["title"].pk}/reviews/'
+        api_client.get(url)
+        api_client.get(url + '?limit=2')
+        records = read_log(slow_log)
+        described = [record for record in records if 'sql' in record]
+        fingerprints = {record['fingerprint'] for record in records}
+        assert len(described) == len(fingerprints), (
+            'Проверьте, что SQL и план пишутся один раз для отпечатка'
+        )
+        assert len(records) > len(described)
+        review_query = next(
+            record for record in described
+            if 'FROM "reviews_review"' in record['sql']
+            and record['plan']
+        )
+        assert review_query['endpoint'] == f'GET {url}'
+        assert any('api/v1/' in frame for frame in review_query['stack'])
+
+    def test_threshold(self, catalogue, api_client, slow_log, settings):
+        settings.SLOW_QUERY_THRESHOLD_MS = 10000
+        api_client.get('/api/v1/genres/')
+        assert not slow_log.exists()
+
+    def test_top_offenders(self, catalogue, api_client, slow_log, capsys):
+        for _ in range(3):
+            api_client.get(f'/api/v1/titles/{catalogue["title"].pk}/reviews/')
+        call_command('slow_queries', top=1, sort='count', plans=True)
+        output = capsys.readouterr().out
+        assert output.startswith('1. ')
+        # Количество строк для ETag и для пагинации - один и тот же запрос.
+        assert 'повторов: 6' in output
+        assert 'SQL: SELECT' in output
@@ -0,0 +1,71 @@
+import pytest
+from django.urls import reverse
+
+
+def obtain_token(client, user):
+    from django.contrib.auth.tokens import default_token_generator
+
+    response = client.post(reverse('api:get_token'), {
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 200
+    return response.json()['token']
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+
+    def test_permissions_are_checked_without_user_query(
+        self, admin, api_client, django_assert_num_queries
+    ):
+        token = obtain_token(api_client, admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = reverse('api:user-list')
+        api_client.get(url)
+        # Версия токенов закеширована: остаются только запросы
+        # количества и страницы пользователей.
+        with django_assert_num_queries(2):
+            response = api_client.get(url)
+        assert response.status_code == 200
+
+    def test_role_change_revokes_token(
+        self, admin, api_client, django_capture_on_commit_callbacks
+    ):
+        token = obtain_token(api_client, admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = reverse('api:user-list')
+        assert api_client.get(url).status_code == 200
+
+        with django_capture_on_commit_callbacks(execute=True):
+            admin.role = 'user'
+            admin.save()
+        assert api_client.get(url).status_code == 401, (
+            'Проверьте, что после смены роли старый токен отклоняется'
+        )
+
+        token = obtain_token(api_client, admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert api_client.get(url).status_code == 403
+
+    def test_author_can_edit_own_review(self, catalogue, api_client):
+        review = catalogue['review']
+        token = obtain_token(api_client, review.author)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        url = reverse(
+            'api:reviews-detail',
+            kwargs={'title_id': review.title_id, 'pk': review.pk}
+        )
+        response = api_client.patch(url, {'text': 'Исправленный отзыв'})
+        assert response.status_code == 200
+        other = catalogue['title'].reviews.exclude(
+            author=review.author
+        ).first()
+        response = api_client.patch(
+            reverse(
+                'api:reviews-detail',
+                kwargs={'title_id': other.title_id, 'pk': other.pk}
+            ),
+            {'text': 'Чужой отзыв'}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.fixture
+def auth_rates(monkeypatch):
+    from api.v1.throttling import TokenBucketThrottle
+
+    monkeypatch.setattr(TokenBucketThrottle, 'THROTTLE_RATES', {
+        'auth_ip': '4/min', 'auth_username': '2/min', 'auth_email': None,
+    })
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def test_username_limit(self, auth_rates, api_client):
+        url = reverse('api:get_token')
+        data = {'username': 'Reader', 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert api_client.post(url, data).status_code == 404
+        response = api_client.post(
+            url, {**data, 'username': ' reader '}
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что лимит считается по имени пользователя'
+        )
+        assert int(response['Retry-After']) > 0
+        response = api_client.post(url, {**data, 'username': 'other'})
+        assert response.status_code == 404
+
+    def test_rejected_before_database_work(
+        self, auth_rates, api_client, django_assert_num_queries
+    ):
+        url = reverse('api:signup')
+        for i in range(4):
+            api_client.post(url, {'username': f'u{i}', 'email': 'bad'})
+        with django_assert_num_queries(0):
+            response = api_client.post(
+                url, {'username': 'u9', 'email': 'u9@yamdb.fake'}
+            )
+        assert response.status_code == 429, (
+            'Проверьте, что лимит считается по IP-адресу'
+        )
+
+    def test_forwarded_for_cannot_bypass_ip_limit(
+        self, auth_rates, api_client
+    ):
+        url = reverse('api:signup')
+        statuses = [
+            api_client.post(
+                url, {'username': f'u{i}', 'email': 'bad'},
+                # nginx дописывает адрес клиента к присланному заголовку.
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 203.0.113.7'
+            ).status_code
+            for i in range(5)
+        ]
+        assert statuses[-1] == 429, (
+            'Проверьте, что подмена X-Forwarded-For не обходит лимит по IP'
+        )
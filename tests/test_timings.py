@@ -0,0 +1,88 @@
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+
+@pytest.fixture(autouse=True)
+def reset_timings():
+    from api.timings import reset_timings
+
+    reset_timings()
+    yield
+    reset_timings()
+
+
+def server_timing(response):
+    return dict(
+        (name, params) for name, _, params in (
+            metric.partition(';')
+            for metric in response['Server-Timing'].split(', ')
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestTimingMiddleware:
+
+    def test_server_timing_header(self, catalogue, api_client):
+        response = api_client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        metrics = server_timing(response)
+        assert set(metrics) == {'total', 'db', 'serialize', 'app', 'cache'}
+        assert re.search(r'desc="[1-9]\d* queries"', metrics['db']), (
+            'Проверьте, что в заголовке Server-Timing учтены запросы к БД'
+        )
+        assert metrics['cache'] == 'desc="hits 0 misses 1"'
+
+        response = api_client.get('/api/v1/categories/')
+        metrics = server_timing(response)
+        assert metrics['db'].endswith('desc="0 queries"')
+        assert metrics['cache'] == 'desc="hits 1 misses 0"'
+
+    def test_sampling(self, catalogue, api_client, settings):
+        from api.timings import endpoint_timings
+
+        settings.TIMING_SAMPLE_RATE = 0
+        response = api_client.get('/api/v1/categories/')
+        assert not response.has_header('Server-Timing')
+        assert endpoint_timings()['endpoints'] == {}
+
+    def test_endpoint_histogram(self, catalogue, api_client, admin_client):
+        for _ in range(3):
+            api_client.get('/api/v1/genres/')
+        title_id = catalogue['title'].pk
+        api_client.get(f'/api/v1/titles/{title_id}/reviews/')
+
+        assert api_client.get('/api/v1/metrics/timings/').status_code == 401
+        response = admin_client.get('/api/v1/metrics/timings/')
+        assert response.status_code == 200
+        endpoints = response.data['endpoints']
+        assert endpoints['GET api:genres-list']['count'] == 3
+        reviews = endpoints['GET api:reviews-list']
+        assert reviews['count'] == 1
+        assert reviews['db_queries_mean'] > 0
+        assert reviews['p50_ms'] <= reviews['p95_ms'] <= reviews['p99_ms']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queries_in_thread_pool_measured():
+    from api.timings import RequestTimings, measure_request
+    from api.v1.asynchronous import asynchronous_urls
+    from api.v1.urls import router_v1
+    from reviews.models import Category
+
+    Category.objects.create(name='Фильмы', slug='movie')
+    view = next(
+        pattern.callback
+        for pattern in asynchronous_urls(router_v1.urls, ('categories',))
+        if getattr(pattern, 'name', None) == 'categories-list'
+    )
+    with measure_request(RequestTimings()) as timings:
+        response = async_to_sync(view)(RequestFactory().get('/'))
+    assert response.status_code == 200
+    assert timings.db_queries > 0, (
+        'Проверьте, что запросы представления в пуле потоков учитываются'
+    )
+    assert timings.render_time > 0
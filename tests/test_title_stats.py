@@ -0,0 +1,67 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_stats_endpoint(self, catalogue, api_client):
+        title = catalogue['title']
+        response = api_client.get(
+            reverse('api:titles-stats', kwargs={'pk': title.pk})
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 12
+        assert data['scores'] == {
+            '1': 2, '2': 2, '3': 1, '4': 1, '5': 1,
+            '6': 1, '7': 1, '8': 1, '9': 1, '10': 1,
+        }
+        assert data['mean'] == pytest.approx(58 / 12)
+        assert data['median'] == 4.5
+        assert data['last_review'] is not None
+
+    def test_stats_follow_review_changes(self, catalogue):
+        from reviews.aggregates import rebuild_title_stats
+        from reviews.models import Title, TitleStats
+
+        title = catalogue['title']
+        other = catalogue['titles'][1]
+        review = title.reviews.get(score=10)
+        review.score = 3
+        review.save()
+        moved = title.reviews.get(score=1, text='Отзыв 0')
+        moved.title = other
+        moved.save()
+        title.reviews.filter(score=2).first().delete()
+
+        incremental = {
+            stats.title_id: (stats.histogram, stats.last_review)
+            for stats in TitleStats.objects.all()
+        }
+        rebuild_title_stats(Title.objects.all())
+        rebuilt = {
+            stats.title_id: (stats.histogram, stats.last_review)
+            for stats in TitleStats.objects.all()
+            if stats.count or stats.title_id in incremental
+        }
+        assert incremental == rebuilt, (
+            'Проверьте, что статистика обновляется при изменении отзывов '
+            'так же, как при пересчёте с нуля'
+        )
+        assert incremental[other.pk][0][0] == 1
+
+    def test_stats_list_for_titles_without_reviews(
+        self, catalogue, api_client
+    ):
+        response = api_client.get(
+            reverse('api:titles-stats-list'), {'limit': 5}
+        )
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == 5
+        empty = [item for item in results if item['count'] == 0]
+        assert empty and all(
+            item['mean'] is None and item['median'] is None
+            for item in empty
+        )